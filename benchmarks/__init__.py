@@ -0,0 +1,3 @@
+"""
+Benchmarks for KAP Semantic Search
+"""
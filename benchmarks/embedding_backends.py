@@ -0,0 +1,95 @@
+import argparse
+import multiprocessing
+import random
+import resource
+import time
+import numpy as np
+from src.core.config import config
+from src.core.embedding_engine import OnnxBackend, SentenceTransformerBackend
+
+WORDS = (
+    "şirket", "dönem", "net", "kâr", "satış", "gelirleri", "bağımsız", "denetim", "raporu", "finansal",
+    "durum", "tablosu", "özkaynak", "yatırım", "borç", "nakit", "akışı", "faaliyet", "yönetim", "kurulu",
+    "the", "company", "reported", "revenue", "growth", "in", "the", "third", "quarter", "of", "2025"
+)
+
+
+def make_sentences(rng, count, min_words, max_words):
+    return [" ".join(rng.choice(WORDS) for _ in range(rng.randint(min_words, max_words))) + "." for _ in range(count)]
+
+
+def create_backend(name, args):
+    if name == "torch":
+        return SentenceTransformerBackend(args.model, max_seq_length=args.max_seq_length, batch_size=args.batch_size)
+    onnx_file = args.onnx_fp32 if name == "onnx-fp32" else args.onnx_int8
+    return OnnxBackend(args.model, onnx_file, max_seq_length=args.max_seq_length, batch_size=args.batch_size, threads=args.threads)
+
+
+def run_backend(name, args, sentences, results):
+    # Each backend runs in a fresh process so peak RSS is not shared between them.
+    started = time.perf_counter()
+    backend = create_backend(name, args)
+    load_seconds = time.perf_counter() - started
+
+    backend.encode(sentences[:args.batch_size])
+    started = time.perf_counter()
+    embeddings = backend.encode(sentences)
+    encode_seconds = time.perf_counter() - started
+
+    results[name] = {
+        "load_seconds": load_seconds,
+        "encode_seconds": encode_seconds,
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "embeddings": np.vstack(embeddings)
+    }
+
+
+def cosine(a, b):
+    a = a / np.linalg.norm(a, axis=1, keepdims=True)
+    b = b / np.linalg.norm(b, axis=1, keepdims=True)
+    return (a * b).sum(axis=1)
+
+
+def main(args):
+    rng = random.Random(args.seed)
+    sentences = make_sentences(rng, args.sentences, args.min_words, args.max_words)
+
+    context = multiprocessing.get_context("spawn")
+    manager = context.Manager()
+    results = manager.dict()
+    for name in args.backends:
+        process = context.Process(target=run_backend, args=(name, args, sentences, results))
+        process.start()
+        process.join()
+        if process.exitcode != 0:
+            print(f"{name}: failed with exit code {process.exitcode}")
+
+    print(f"{len(sentences)} sentences, model {args.model}, batch size {args.batch_size}")
+    print(f"{'backend':<10} {'load s':>8} {'encode s':>9} {'sent/sec':>10} {'peak MB':>9} {'min cos':>8} {'mean cos':>9}")
+    reference = results.get(args.backends[0])
+    for name in args.backends:
+        if name not in results:
+            continue
+        result = results[name]
+        similarity = cosine(reference["embeddings"], result["embeddings"])
+        print(
+            f"{name:<10} {result['load_seconds']:>8.1f} {result['encode_seconds']:>9.2f} "
+            f"{len(sentences) / result['encode_seconds']:>10.1f} {result['peak_rss_mb']:>9.0f} "
+            f"{similarity.min():>8.4f} {similarity.mean():>9.4f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare sentence-transformers and ONNX Runtime embedding backends")
+    parser.add_argument("--model", default=config.EMBEDDING_MODEL_NAME)
+    parser.add_argument("--backends", nargs="+", default=["torch", "onnx-fp32", "onnx-int8"], choices=["torch", "onnx-fp32", "onnx-int8"])
+    parser.add_argument("--onnx-fp32", default="onnx/model.onnx")
+    parser.add_argument("--onnx-int8", default=config.EMBEDDING_ONNX_FILE)
+    parser.add_argument("--sentences", type=int, default=2000)
+    parser.add_argument("--min-words", type=int, default=8)
+    parser.add_argument("--max-words", type=int, default=60)
+    parser.add_argument("--batch-size", type=int, default=config.EMBEDDING_MAX_BATCH_SIZE)
+    parser.add_argument("--max-seq-length", type=int, default=config.EMBEDDING_MAX_SEQ_LENGTH)
+    parser.add_argument("--threads", type=int, default=config.EMBEDDING_THREADS)
+    parser.add_argument("--seed", type=int, default=7)
+    main(parser.parse_args())
@@ -0,0 +1,109 @@
+import argparse
+import glob
+import os
+import random
+import tempfile
+import time
+from src.processors.html_table_parser import BeautifulSoupTableParser, LxmlTableParser
+
+
+def make_cell(rng):
+    value = f"{rng.randint(0, 9_999_999):,}".replace(",", ".")
+    kind = rng.random()
+    if kind < 0.15:
+        return "<td></td>"
+    if kind < 0.25:
+        return f'<td><div class="taxonomy-footnote-value">{rng.randint(1, 40)}</div></td>'
+    if kind < 0.5:
+        return f'<td class="number"><span> {value} </span><!-- {value} --></td>'
+    if kind < 0.55:
+        return f'<td colspan="{rng.choice(["2", "3", " 1 "])}">Kalem &amp; {value}<br/>TL&nbsp;</td>'
+    return f"<td>\n  <div>{value}</div>\n</td>"
+
+
+def make_table(rng, rows, cols):
+    parts = ['<table class="financial-header-table"><tr><td>Finansal Durum Tablosu</td><td>Cari Dönem</td></tr></table>']
+    header = "".join(f"<th>{rng.choice(['TC', 'FC', 'Total'])}</th>" for _ in range(cols))
+    parts.append(f'<table class="financial-table"><thead><tr>{header}</tr></thead><tbody>')
+    for r in range(rows):
+        label = f"<td>Kalem {r} {rng.choice(['Nakit', 'Alacaklar', 'Stoklar', 'Krediler'])}</td>"
+        parts.append("<tr>" + label + "".join(make_cell(rng) for _ in range(cols - 1)) + "</tr>")
+    parts.append("</tbody></table>")
+    if rng.random() < 0.2:
+        parts.append('<table><tr><td rowspan="5">Complex</td><td>x</td></tr></table>')
+    return "".join(parts)
+
+
+def make_document(rng, tables, max_rows, max_cols):
+    body = "".join(
+        f"<div class=\"gwt-HTML\">{make_table(rng, rng.randint(5, max_rows), rng.randint(4, max_cols))}</div>"
+        for _ in range(tables)
+    )
+    return f"<html><head><meta charset=\"utf-8\"><style>td {{}}</style></head><body><script>var x = 1;</script>{body}</body></html>"
+
+
+def load_corpus(args):
+    files = sorted(glob.glob(os.path.join(args.html_dir, "*.html")))[:args.files] if args.html_dir else []
+    if files:
+        return files, None
+
+    rng = random.Random(args.seed)
+    tmp_dir = tempfile.TemporaryDirectory()
+    for i in range(args.files):
+        with open(os.path.join(tmp_dir.name, f"{i}.html"), "w", encoding="utf-8") as f:
+            f.write(make_document(rng, rng.randint(1, args.max_tables), args.max_rows, args.max_cols))
+    return sorted(glob.glob(os.path.join(tmp_dir.name, "*.html"))), tmp_dir
+
+
+def read(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def timed(func, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    return (time.perf_counter() - started) / repeat, result
+
+
+def main(args):
+    files, tmp_dir = load_corpus(args)
+    documents = [read(path) for path in files]
+    bs4_parser = BeautifulSoupTableParser()
+    lxml_parser = LxmlTableParser()
+
+    backends = {
+        "bs4": lambda: [list(bs4_parser.iter_tables(html)) for html in documents],
+        "lxml": lambda: [list(lxml_parser.iter_tables(html)) for html in documents],
+        "lxml-stream": lambda: [list(lxml_parser.iter_tables_from_file(path)) for path in files],
+    }
+
+    results = {}
+    timings = {}
+    print(f"{'backend':<12} {'total ms':>10} {'ms/file':>8} {'speedup':>8}")
+    for name, run in backends.items():
+        timings[name], results[name] = timed(run, args.repeat)
+        speedup = timings["bs4"] / timings[name] if timings[name] else float("inf")
+        print(f"{name:<12} {timings[name] * 1000:>10.1f} {timings[name] * 1000 / len(files):>8.2f} {speedup:>7.1f}x")
+
+    for name in ("lxml", "lxml-stream"):
+        mismatches = [path for path, expected, actual in zip(files, results["bs4"], results[name]) if expected != actual]
+        for path in mismatches[:5]:
+            print(f"{name}: tables differ from bs4 for {path}")
+        print(f"Parity {name}: {len(files) - len(mismatches)}/{len(files)} files identical to bs4")
+
+    if tmp_dir is not None:
+        tmp_dir.cleanup()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare BeautifulSoup and lxml table extraction on notification HTML files")
+    parser.add_argument("--html-dir", default="notification_htmls", help="Directory of saved notification HTML files; a synthetic corpus is generated when empty")
+    parser.add_argument("--files", type=int, default=40)
+    parser.add_argument("--max-tables", type=int, default=6)
+    parser.add_argument("--max-rows", type=int, default=120)
+    parser.add_argument("--max-cols", type=int, default=8)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=7)
+    main(parser.parse_args())
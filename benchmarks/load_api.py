@@ -0,0 +1,78 @@
+import argparse
+import asyncio
+import statistics
+import time
+import httpx
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+async def run_level(client, url, payload, concurrency, total_requests):
+    latencies = []
+    errors = 0
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one_request():
+        nonlocal errors
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                response = await client.post(url, json=payload)
+                response.raise_for_status()
+            except Exception:
+                errors += 1
+                return
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one_request() for _ in range(total_requests)))
+    elapsed = time.perf_counter() - started
+
+    return {
+        "concurrency": concurrency,
+        "requests": total_requests,
+        "errors": errors,
+        "throughput": len(latencies) / elapsed if elapsed else 0.0,
+        "p50": percentile(latencies, 50),
+        "p95": percentile(latencies, 95),
+        "p99": percentile(latencies, 99),
+        "mean": statistics.mean(latencies) if latencies else 0.0
+    }
+
+
+async def main(args):
+    url = f"{args.base_url.rstrip('/')}{args.endpoint}"
+    if args.endpoint == "/company_search":
+        payload = {"company": args.text}
+    else:
+        payload = {"question": args.text}
+
+    timeout = httpx.Timeout(args.timeout)
+    limits = httpx.Limits(max_connections=max(args.concurrency), max_keepalive_connections=max(args.concurrency))
+    async with httpx.AsyncClient(timeout=timeout, limits=limits) as client:
+        print(f"{'clients':>8} {'reqs':>6} {'errors':>7} {'req/s':>8} {'p50':>8} {'p95':>8} {'p99':>8}")
+        for concurrency in args.concurrency:
+            total = max(args.requests_per_client * concurrency, args.min_requests)
+            result = await run_level(client, url, payload, concurrency, total)
+            print(
+                f"{result['concurrency']:>8} {result['requests']:>6} {result['errors']:>7} "
+                f"{result['throughput']:>8.2f} {result['p50']:>8.3f} {result['p95']:>8.3f} {result['p99']:>8.3f}"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure API latency percentiles as concurrent clients grow")
+    parser.add_argument("--base-url", default="http://localhost:8001")
+    parser.add_argument("--endpoint", default="/company_search", choices=["/query", "/company_search"])
+    parser.add_argument("--text", default="GARAN")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16, 64])
+    parser.add_argument("--requests-per-client", type=int, default=5)
+    parser.add_argument("--min-requests", type=int, default=20)
+    parser.add_argument("--timeout", type=float, default=120.0)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,195 @@
+import argparse
+import gzip
+import json
+import os
+import random
+import subprocess
+import tempfile
+import time
+import pandas as pd
+from src.processors.excel_processor import ExcelProcessor
+from src.services.chroma_table_service import excel_to_json
+from src.utils.table_frame import excel_round_trip
+
+
+# The golden outputs come from the shipped (pre-vectorization) implementation, with its
+# xlsx write and read back, and are checked in so tests compare against what actually ran.
+BASELINE_REVISION = "07a52f7"
+GOLDEN_PATH = os.path.join(os.path.dirname(__file__), os.pardir, "tests", "fixtures", "table_cleaning_golden.json.gz")
+
+
+def load_baseline_processor(revision):
+    """Loads ExcelProcessor from the given git revision; its process_table_data writes notification_htmls/ workbooks."""
+    path = "src/processors/excel_processor.py"
+    source = subprocess.run(["git", "show", f"{revision}:{path}"], capture_output=True, text=True, check=True).stdout
+    # The storage-backed TableChunk is not needed to clean a table.
+    namespace = {"__name__": "baseline_excel_processor"}
+    exec(compile(source.replace("from .table_chunk import TableChunk\n", ""), f"{revision}:{path}", "exec"), namespace)
+    return make_processor(namespace["ExcelProcessor"])
+
+
+def baseline_documents(corpus, revision):
+    """Runs the baseline over the corpus and returns each cleaned table as stored in Chroma, or None if rejected."""
+    processor = load_baseline_processor(revision)
+    documents = []
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        try:
+            os.makedirs("notification_htmls")
+            for i, table in enumerate(corpus):
+                processor.process_table_data(table, "golden", i)
+                path = f"notification_htmls/golden_table_{i}.xlsx"
+                documents.append(excel_to_json(pd.read_excel(path)) if os.path.exists(path) else None)
+        finally:
+            os.chdir(cwd)
+    return documents
+
+
+def write_golden(path, revision, seed, tables, max_rows, max_cols):
+    corpus = make_corpus(random.Random(seed), tables, max_rows, max_cols)
+    golden = {"revision": revision, "seed": seed, "tables": corpus, "documents": baseline_documents(corpus, revision)}
+    with gzip.open(path, "wt", encoding="utf-8") as file:
+        json.dump(golden, file, ensure_ascii=False)
+    return golden
+
+
+def load_golden(path=GOLDEN_PATH):
+    with gzip.open(path, "rt", encoding="utf-8") as file:
+        return json.load(file)
+
+
+def rowwise_only_second_column_has_data(df):
+    col1_non_empty = df.iloc[:, 1].notna() & (df.iloc[:, 1] != "")
+    other_cols = df.drop(df.columns[1], axis=1)
+    other_cols_empty_or_nan = other_cols.apply(lambda col: col.map(lambda x: pd.isna(x) or x == ""))
+    return col1_non_empty & other_cols_empty_or_nan.all(axis=1)
+
+
+def rowwise_compact_rows(df):
+    for idx in df.index:
+        row_values = df.iloc[idx].values
+        non_empty_values = [val for val in row_values if val and val.strip() and val.lower() not in ["nan", "<na>", "none", "nat"]]
+        padded_values = non_empty_values + [""] * (len(row_values) - len(non_empty_values))
+        df.iloc[idx] = padded_values
+    return df
+
+
+def make_processor(cls):
+    # Skip __init__: the cleaning steps do not need the Chroma-backed TableChunk.
+    return cls.__new__(cls)
+
+
+def make_table(rng, rows, cols):
+    def cell(probability_empty=0.3):
+        if rng.random() < probability_empty:
+            return rng.choice(["", " ", "nan", "None"])
+        return f"{rng.randint(0, 9_999_999):,}".replace(",", ".")
+
+    # The title, note and currency rows must differ in columns 1-2, otherwise drop_duplicates
+    # removes the note row and both implementations reject the table.
+    table = [["Finansal Durum Tablosu", "(TL)"] + [""] * (cols - 2)]
+    table.append(["", "Dipnot"] + [rng.choice(["Cari Dönem", "Önceki Dönem"]) for _ in range(cols - 2)])
+    table.append([""] * 5 + [rng.choice(["", "31.12.2024", "31.12.2023", "Bağımsız Denetimden Geçmiş"]) for _ in range(cols - 5)])
+    if rng.random() < 0.7:
+        table.append(["", "", "TC"] + [rng.choice(["TC", "FC", "Total", ""]) for _ in range(cols - 3)])
+    else:
+        table.append(["", "", "Bin TL"] + [""] * (cols - 3))
+    for r in range(rows):
+        label = f"Kalem {r} " + rng.choice(["Nakit", "Alacaklar", "Stoklar", "Krediler", "Mevduat"])
+        table.append([label, rng.choice(["", "5", "7.1", "12"])] + [cell() for _ in range(cols - 2)])
+    return table
+
+
+def make_corpus(rng, tables, max_rows, max_cols):
+    # Every tenth table has no body rows, which both implementations reject.
+    return [
+        make_table(rng, 0 if i % 10 == 9 else rng.randint(10, max_rows), rng.randint(8, max_cols))
+        for i in range(tables)
+    ]
+
+
+def golden_comparison(golden):
+    """Cleans the golden tables; returns the number of cleaned documents compared and the mismatches."""
+    current = make_processor(ExcelProcessor)
+
+    compared = 0
+    mismatches = []
+    for i, (table, expected) in enumerate(zip(golden["tables"], golden["documents"])):
+        df = current.process_table_data(table, "golden", i)
+        actual = None if df is None else excel_to_json(df)
+        if actual != expected:
+            mismatches.append((i, f"baseline stored {expected!r}, vectorized {actual!r}"))
+        elif actual is not None:
+            compared += 1
+    return compared, mismatches
+
+
+def prepare(table):
+    df = pd.DataFrame(table)
+    for col in df.columns:
+        df[col] = df[col].astype(str)
+    return excel_round_trip(df)
+
+
+def timed(func, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    return (time.perf_counter() - started) / repeat, result
+
+
+def main(args):
+    if args.write_golden:
+        golden = write_golden(args.golden, args.baseline_revision, args.seed, args.tables, args.max_rows, args.max_cols)
+        print(f"Wrote {len(golden['tables'])} tables cleaned by {args.baseline_revision} to {args.golden}")
+        return
+
+    golden = load_golden(args.golden)
+    compared, mismatches = golden_comparison(golden)
+    for i, error in mismatches:
+        print(f"table {i}: output differs from {golden['revision']}: {error}")
+    print(f"Golden comparison: {len(golden['tables']) - len(mismatches)}/{len(golden['tables'])} tables identical, {compared} cleaned documents compared")
+    assert compared > 0, "no table survived cleaning; the comparison is vacuous"
+
+    rng = random.Random(args.seed)
+    corpus = make_corpus(rng, args.tables, args.max_rows, args.max_cols)
+    legacy = load_baseline_processor(args.baseline_revision)
+    current = make_processor(ExcelProcessor)
+    frames = [prepare(table) for table in corpus]
+    # The row-by-row only-second-column and compaction loops were inline in the baseline's
+    # process_table_data, so they are timed from copies; the other steps are the baseline's own.
+    steps = {
+        "only_second_column_has_data": (
+            lambda df: rowwise_only_second_column_has_data(df),
+            lambda df: current.only_second_column_has_data(df)
+        ),
+        "process_tc_fc_data": (lambda df: legacy.process_tc_fc_data(df.copy()), lambda df: current.process_tc_fc_data(df.copy())),
+        "process_header": (lambda df: legacy.process_header(df.astype(str)), lambda df: current.process_header(df.astype(str))),
+        "compact_rows": (
+            lambda df: rowwise_compact_rows(df.astype(str).reset_index(drop=True)),
+            lambda df: current.compact_rows(df.astype(str).reset_index(drop=True))
+        )
+    }
+    print(f"{'step':<30} {'legacy ms':>10} {'vectorized ms':>14} {'speedup':>8}")
+    for name, (legacy_step, current_step) in steps.items():
+        legacy_seconds, _ = timed(lambda: [legacy_step(df) for df in frames], args.repeat)
+        current_seconds, _ = timed(lambda: [current_step(df) for df in frames], args.repeat)
+        speedup = legacy_seconds / current_seconds if current_seconds else float("inf")
+        print(f"{name:<30} {legacy_seconds * 1000:>10.1f} {current_seconds * 1000:>14.1f} {speedup:>7.1f}x")
+    current_seconds, _ = timed(lambda: [current.process_table_data(t, "bench", 0) for t in corpus], args.repeat)
+    print(f"{'process_table_data':<30} {'-':>10} {current_seconds * 1000:>14.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare vectorized table cleaning with the row-by-row implementation")
+    parser.add_argument("--tables", type=int, default=50)
+    parser.add_argument("--max-rows", type=int, default=300)
+    parser.add_argument("--max-cols", type=int, default=14)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--golden", default=GOLDEN_PATH)
+    parser.add_argument("--baseline-revision", default=BASELINE_REVISION)
+    parser.add_argument("--write-golden", action="store_true",
+                        help="Regenerate the golden outputs by running the baseline revision over a seeded corpus")
+    main(parser.parse_args())
@@ -0,0 +1,138 @@
+import argparse
+import random
+import re
+import time
+import pandas as pd
+from src.utils.split_text import split_text_into_sentences
+
+
+def legacy_split_text_into_sentences(text, min_words=300, max_words=320):
+    if not text or pd.isna(text):
+        return []
+
+    text = str(text).strip()
+    if not text:
+        return []
+
+    text = text.replace('\n', ' ').replace('\r', ' ')
+    text = ' '.join(text.split())
+
+    text = re.sub(r'([.!?])\s+', r'\1\n', text)
+    sentences = text.split('\n')
+
+    chunks = []
+    current_chunk = []
+    current_word_count = 0
+    last_sentence = None
+
+    for sentence in sentences:
+        sentence = sentence.strip()
+        if not sentence:
+            continue
+
+        sentence_words = sentence.split()
+        sentence_word_count = len(sentence_words)
+
+        if not current_chunk and last_sentence:
+            current_chunk.extend(last_sentence.split())
+            current_word_count = len(last_sentence.split())
+
+        if current_word_count + sentence_word_count > max_words and current_chunk:
+            last_sentence = ' '.join(current_chunk[-sentence_word_count:]) if sentence_word_count < len(current_chunk) else sentence
+
+            chunks.append(' '.join(current_chunk))
+
+            current_chunk = sentence_words
+            current_word_count = sentence_word_count
+        else:
+            current_chunk.extend(sentence_words)
+            current_word_count += sentence_word_count
+
+        if current_word_count >= min_words and sentence.endswith(('.', '!', '?')):
+            last_sentence = sentence
+
+            chunks.append(' '.join(current_chunk))
+            current_chunk = []
+            current_word_count = 0
+
+    if current_chunk:
+        chunks.append(' '.join(current_chunk))
+
+    return chunks
+
+
+WORDS = [
+    "Şirketin", "31", "Aralık", "2024", "tarihli", "konsolide", "finansal", "durum", "tablosu", "ile", "aynı",
+    "tarihte", "sona", "eren", "hesap", "dönemine", "ait", "kâr", "veya", "zarar", "tablosu,", "özkaynaklar",
+    "değişim", "tablosu", "ve", "nakit", "akış", "tablosunu", "bağımsız", "denetimini", "yapmış", "bulunuyoruz",
+    "Görüşümüze", "göre", "ilişikteki", "tablolar", "tüm", "önemli", "yönleriyle", "TFRS'lere", "uygun", "olarak",
+    "gerçeğe", "uygun", "bir", "biçimde", "sunmaktadır", "Kilit", "denetim", "konuları", "1.234.567", "TL", "(%12,5)"
+]
+
+
+def make_audit_opinion(rng, words):
+    parts = []
+    for _ in range(words):
+        word = rng.choice(WORDS)
+        roll = rng.random()
+        if roll < 0.06:
+            word += rng.choice([".", ".", ".", "!", "?"])
+        elif roll < 0.08:
+            word += "\n"
+        elif roll < 0.085:
+            word += " \r\n\t "
+        parts.append(word)
+    # Long audit opinions contain run-on sections (tables pasted as text) with no sentence breaks.
+    if rng.random() < 0.3:
+        start = rng.randrange(len(parts))
+        for i in range(start, min(len(parts), start + rng.randint(300, 900))):
+            parts[i] = parts[i].rstrip(".!?")
+    return " ".join(parts)
+
+
+def timed(func, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    return (time.perf_counter() - started) / repeat, result
+
+
+def main(args):
+    rng = random.Random(args.seed)
+    corpus = [make_audit_opinion(rng, rng.randint(args.min_words, args.max_words)) for _ in range(args.texts)]
+    corpus += ["", "Tek cümle.", "a. b. c.", ". ! ?", "nokta.yok boşluk"]
+
+    mismatches = 0
+    for i, text in enumerate(corpus):
+        for min_words, max_words in ((300, 320), (20, 25), (1, 2), (50, 40)):
+            expected = legacy_split_text_into_sentences(text, min_words, max_words)
+            actual = split_text_into_sentences(text, min_words, max_words, translate=False)
+            if expected != actual:
+                mismatches += 1
+                print(f"text {i} ({min_words}-{max_words} words): chunks differ from legacy implementation")
+    print(f"Golden comparison: {len(corpus) * 4 - mismatches}/{len(corpus) * 4} cases byte-identical")
+
+    total_words = sum(len(text.split()) for text in corpus)
+    legacy_seconds, legacy_chunks = timed(lambda: [legacy_split_text_into_sentences(text) for text in corpus], args.repeat)
+    offset_seconds, _ = timed(lambda: [split_text_into_sentences(text, translate=False) for text in corpus], args.repeat)
+    relaxed_seconds, relaxed_chunks = timed(lambda: [split_text_into_sentences(text, translate=False, compat=False) for text in corpus], args.repeat)
+
+    print(f"{len(corpus)} texts, {total_words} words")
+    print(f"{'implementation':<16} {'ms':>10} {'words/sec':>14} {'chunks':>8} {'speedup':>8}")
+    for name, seconds, chunks in (
+        ("legacy", legacy_seconds, legacy_chunks),
+        ("offsets", offset_seconds, legacy_chunks),
+        ("offsets-relaxed", relaxed_seconds, relaxed_chunks)
+    ):
+        chunk_count = sum(len(text_chunks) for text_chunks in chunks)
+        print(f"{name:<16} {seconds * 1000:>10.1f} {total_words / seconds:>14,.0f} {chunk_count:>8} {legacy_seconds / seconds:>7.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare offset-based sentence chunking with the list-based implementation")
+    parser.add_argument("--texts", type=int, default=200)
+    parser.add_argument("--min-words", type=int, default=2000)
+    parser.add_argument("--max-words", type=int, default=40000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=7)
+    main(parser.parse_args())
@@ -0,0 +1,80 @@
+import logging
+import threading
+import time
+from contextlib import asynccontextmanager
+from ..core.config import config
+from ..core.concurrency import run_blocking, shutdown_executor
+from ..services.chatbot_service import KAPChatbot
+
+logger = logging.getLogger(__name__)
+
+
+class AppResources:
+    def __init__(self):
+        self.chatbot = None
+        self.error = None
+        self.startup_seconds = None
+        self.warmup_seconds = None
+        self._lock = threading.Lock()
+
+    @property
+    def ready(self):
+        return self.chatbot is not None
+
+    def load(self):
+        with self._lock:
+            if self.chatbot is not None:
+                return self.chatbot
+            try:
+                started = time.perf_counter()
+                chatbot = KAPChatbot()
+                self.startup_seconds = time.perf_counter() - started
+
+                warmup_started = time.perf_counter()
+                chatbot.warmup(config.EMBEDDING_WARMUP_TEXTS)
+                self.warmup_seconds = time.perf_counter() - warmup_started
+
+                self.chatbot = chatbot
+                self.error = None
+                logger.info(f"Application resources loaded in {self.startup_seconds:.2f}s (warmup {self.warmup_seconds:.2f}s)")
+            except Exception as e:
+                self.error = str(e)
+                logger.error(f"Failed to load application resources: {e}")
+                raise
+            return self.chatbot
+
+    def get_chatbot(self):
+        if self.chatbot is not None:
+            return self.chatbot
+        return self.load()
+
+    def status(self):
+        return {
+            "status": "ready" if self.ready else "not_ready",
+            "embedding_model": config.EMBEDDING_MODEL_NAME,
+            "collections": [
+                self.chatbot.content_collection.name,
+                self.chatbot.table_collection.name
+            ] if self.ready else [],
+            "startup_seconds": self.startup_seconds,
+            "warmup_seconds": self.warmup_seconds,
+            "error": self.error
+        }
+
+    def close(self):
+        self.chatbot = None
+
+
+resources = AppResources()
+
+
+@asynccontextmanager
+async def lifespan(app):
+    try:
+        await run_blocking(resources.load)
+    except Exception:
+        logger.warning("Starting API without loaded resources; they will be loaded on first request")
+    app.state.resources = resources
+    yield
+    resources.close()
+    shutdown_executor()
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional, Dict
+from typing import Optional, Dict, List
 
 class Query(BaseModel):
     question: str
@@ -8,6 +8,8 @@ class Query(BaseModel):
     start_date:  Optional[str] = "2025-01-01"
     end_date: Optional[str] = "2025-05-01"
     period: Optional[str] = "3 Aylık"
+    query_type: Optional[str] = None
+    company: Optional[str] = None
 
 class CompanySearch(BaseModel):
     company: str
@@ -18,4 +20,10 @@ class CompanySearchResponse(BaseModel):
 
 class Response(BaseModel):
     question: Dict
-    answers: Dict 
\ No newline at end of file
+    answers: Dict 
+
+class EmbedRequest(BaseModel):
+    texts: List[str]
+
+class EmbedResponse(BaseModel):
+    embeddings: List[List[float]]
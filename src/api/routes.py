@@ -1,9 +1,11 @@
 from fastapi import FastAPI, HTTPException
 import logging
-from .models import Query, CompanySearch, CompanySearchResponse, Response
-from ..services.chatbot_service import KAPChatbot
-from ..core.prompts import prompt as base_prompt
-import json
+from .models import Query, CompanySearch, CompanySearchResponse, Response, EmbedRequest, EmbedResponse
+from .lifespan import lifespan, resources
+from ..core.concurrency import run_blocking, stage_limiter
+from ..core.config import config
+from ..core.embedding_engine import get_embedding_engine
+from ..core.rate_limiter import llm_rate_limiter
 from ..services.chroma_content_service import ChromaContentService
 from ..services.chroma_table_service import ChromaTableService
 
@@ -12,38 +14,38 @@ logger = logging.getLogger(__name__)
 app = FastAPI(
     title="KAP Chatbot API",
     description="KAP notifications chatbot API",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 chroma_content_service = ChromaContentService()
 chroma_table_service = ChromaTableService()
 
-def _parse_gemini_response(results):
+def _analyze_query(chatbot, query):
+    if query.query_type:
+        return chatbot.build_query_analysis(query.question, query.query_type, query.company)
+
     try:
-        if results.startswith('```json'):
-            results = results[7:]
-        if results.endswith('```'):
-            results = results[:-3]
-        results = results.strip()
-        
-        query_data = json.loads(results)
-        company = query_data.get('args', {}).get('company')
-        search_query = query_data.get('args', {}).get('query')
-        query_type = query_data.get('query_type')
-        
-        return query_data, company, search_query, query_type
-    except json.JSONDecodeError:
-        return None, None, results, None
+        analysis = chatbot.analyze_query(query.question)
+    except ValueError as e:
+        logger.warning(f"Query analysis failed, searching with the raw question: {e}")
+        analysis = chatbot.build_query_analysis(query.question, None)
+
+    if query.company:
+        analysis['args']['company'] = query.company
+    return analysis
 
-def _process_query(chatbot, search_query, company, query_type, distance, max_results, start_date, end_date, period):
+def _process_query(chatbot, query_analysis, distance, max_results, start_date, end_date, period):
+    search_query = query_analysis['args'].get('query')
     search_results = chatbot.search_disclosures(
         response=search_query,
-        company=company,
+        company=query_analysis['args'].get('company'),
         distance_threshold=distance,
-        query_type=query_type,
+        query_type=query_analysis.get('query_type'),
         start_date=start_date,
         end_date=end_date,
-        period=period
+        period=period,
+        query_analysis=query_analysis
         )
         
     return chatbot.format_response(results=search_results, query=search_query, limit=max_results)
@@ -52,19 +54,15 @@ def _process_query(chatbot, search_query, company, query_type, distance, max_res
 @app.post("/query", response_model=Response)
 async def query_kap(query: Query):
     try:
-        chatbot = KAPChatbot()
+        chatbot = await run_blocking(resources.get_chatbot)
         logger.info(f"Received query: {query}")
         
-        full_prompt = base_prompt.format(query=query)
-        results = chatbot.generate_response(full_prompt)
+        query_analysis = await run_blocking(_analyze_query, chatbot, query)
         
-        query_data, company, search_query, query_type = _parse_gemini_response(results)
-        
-        formatted_response = _process_query(
+        formatted_response = await run_blocking(
+            _process_query,
             chatbot=chatbot,
-            search_query=search_query,
-            company=company,
-            query_type=query_type,
+            query_analysis=query_analysis,
             distance=query.distance,
             max_results=query.max_results,
             start_date=query.start_date,
@@ -73,7 +71,7 @@ async def query_kap(query: Query):
         )
         
         return Response(
-            question=query_data or {"query": search_query},
+            question=query_analysis,
             answers=formatted_response
         )
         
@@ -87,8 +85,8 @@ async def query_kap(query: Query):
 @app.post("/company_search", response_model=CompanySearchResponse)
 async def company_search(query: CompanySearch):
     try:
-        chatbot = KAPChatbot()
-        search_results = chatbot.company_search(company=query.company)
+        chatbot = await run_blocking(resources.get_chatbot)
+        search_results = await run_blocking(chatbot.company_search, company=query.company)
         formatted_response = chatbot.format_response_company(search_results, query=query.company)
         
         return CompanySearchResponse(
@@ -99,15 +97,52 @@ async def company_search(query: CompanySearch):
         logger.error(f"Error processing company search: {e}")
         raise HTTPException(status_code=500, detail=str(e)) 
     
+@app.post("/embed", response_model=EmbedResponse)
+async def embed(request: EmbedRequest):
+    if config.EMBEDDING_BACKEND == "remote":
+        raise HTTPException(status_code=400, detail="API is configured with the remote embedding backend")
+    try:
+        engine = await run_blocking(get_embedding_engine)
+        embeddings = await run_blocking(engine.embed, request.texts)
+        return EmbedResponse(embeddings=[embedding.tolist() for embedding in embeddings])
+    except Exception as e:
+        logger.error(f"Error embedding {len(request.texts)} texts: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.get("/health")
 async def health_check():
     try:
-        chroma_content_service.setup_chroma_content()
-        chroma_table_service.setup_chroma_table()
+        await run_blocking(chroma_content_service.setup_chroma_content)
+        await run_blocking(chroma_table_service.setup_chroma_table)
         return {"status": "healthy"}
     except Exception as e:
         logger.error(f"Health check failed: {e}")
         raise HTTPException(
             status_code=503,
             detail="Service unavailable"
-        ) 
\ No newline at end of file
+        )
+
+@app.get("/ready")
+async def readiness_check():
+    if not resources.ready:
+        raise HTTPException(
+            status_code=503,
+            detail=resources.status()
+        )
+    return resources.status()
+
+@app.get("/metrics")
+async def metrics():
+    data = {
+        "stages": stage_limiter.stats(),
+        "llm_rate_limiter": llm_rate_limiter.stats()
+    }
+    if resources.ready:
+        data["embedding"] = get_embedding_engine().stats()
+        data["query_embedding_cache"] = resources.chatbot.embedding_function.stats()
+        data["translation"] = resources.chatbot.translator.stats()
+    if resources.ready and resources.chatbot.query_coalescer is not None:
+        data["chroma_query_coalescer"] = resources.chatbot.query_coalescer.stats()
+    if resources.ready and resources.chatbot.analysis_cache is not None:
+        data["query_analysis_cache"] = resources.chatbot.analysis_cache.stats()
+    return data
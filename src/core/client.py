@@ -1,16 +1,29 @@
 import logging
+import threading
 import chromadb
 from chromadb.config import Settings
 from .config import config
 import redis
-from chromadb.utils.embedding_functions import SentenceTransformerEmbeddingFunction
+from .embedding_engine import EngineEmbeddingFunction, embedding_model_id, get_embedding_engine
 
 logger = logging.getLogger(__name__)
 
+_embedding_function = None
+_embedding_lock = threading.Lock()
+
+
+def get_embedding_function():
+    global _embedding_function
+    if _embedding_function is None:
+        with _embedding_lock:
+            if _embedding_function is None:
+                _embedding_function = EngineEmbeddingFunction(get_embedding_engine())
+                logger.info(f"Embedding model '{embedding_model_id()}' loaded")
+    return _embedding_function
+
+
 class ClientWrapper:
     _instance = None
-    def __init__(self):
-        self.embedding_function = SentenceTransformerEmbeddingFunction(model_name="all-MiniLM-L6-v2")
 
     def __new__(cls):
         if cls._instance is None:
@@ -19,6 +32,7 @@ class ClientWrapper:
         return cls._instance
 
     def _initialize(self):
+        self.embedding_function = get_embedding_function()
         try:
             self.client = chromadb.HttpClient(
                 host=config.CHROMA_HOST,
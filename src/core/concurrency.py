@@ -0,0 +1,94 @@
+import asyncio
+import functools
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager
+from .config import config
+
+logger = logging.getLogger(__name__)
+
+
+class StageLimiter:
+    def __init__(self, limits):
+        self._limits = dict(limits)
+        self._semaphores = {stage: threading.BoundedSemaphore(limit) for stage, limit in limits.items()}
+        self._active = {stage: 0 for stage in limits}
+        self._waiting = {stage: 0 for stage in limits}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def slot(self, stage):
+        semaphore = self._semaphores.get(stage)
+        if semaphore is None:
+            yield
+            return
+
+        with self._lock:
+            self._waiting[stage] += 1
+        semaphore.acquire()
+        with self._lock:
+            self._waiting[stage] -= 1
+            self._active[stage] += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._active[stage] -= 1
+            semaphore.release()
+
+    def stats(self):
+        with self._lock:
+            return {
+                stage: {
+                    "limit": self._limits[stage],
+                    "active": self._active[stage],
+                    "waiting": self._waiting[stage]
+                }
+                for stage in self._limits
+            }
+
+
+stage_limiter = StageLimiter({
+    "llm": config.LLM_CONCURRENCY,
+    "translate": config.TRANSLATE_CONCURRENCY,
+    "chroma": config.CHROMA_CONCURRENCY
+})
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=config.API_WORKER_THREADS,
+                    thread_name_prefix="kap-api"
+                )
+                logger.info(f"Request executor started with {config.API_WORKER_THREADS} threads")
+    return _executor
+
+
+def shutdown_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+
+
+async def run_blocking(func, *args, **kwargs):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_executor(), functools.partial(func, *args, **kwargs))
+
+
+def create_process_pool(max_workers):
+    # Celery prefork children are daemonic and may not fork, so fall back to threads there.
+    if multiprocessing.current_process().daemon:
+        logger.info(f"Running inside a daemonic process, using {max_workers} threads instead of processes")
+        return ThreadPoolExecutor(max_workers=max_workers)
+    return ProcessPoolExecutor(max_workers=max_workers)
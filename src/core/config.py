@@ -1,3 +1,4 @@
+from typing import List
 from pydantic_settings import BaseSettings
 from dotenv import load_dotenv
 
@@ -16,10 +17,87 @@ class Config(BaseSettings):
     CHROMA_SERVER_CORS_ALLOW_ORIGINS: str
     CHROMA_SERVER_AUTH_PROVIDER: str
     LAST_PROCESSED_PATH: str
+    EMBEDDING_MODEL_NAME: str = "all-MiniLM-L6-v2"
+    EMBEDDING_WARMUP_TEXTS: List[str] = ["KAP financial statement", ""]
+    API_WORKER_THREADS: int = 32
+    LLM_CONCURRENCY: int = 4
+    TRANSLATE_CONCURRENCY: int = 8
+    CHROMA_CONCURRENCY: int = 16
+    LLM_MODEL_NAME: str = "gemini-2.0-flash"
+    LLM_REQUESTS_PER_MINUTE: int = 15
+    LLM_RATE_LIMIT_BURST: int = 3
+    LLM_RATE_LIMIT_BACKEND: str = "local"
+    ANALYSIS_CACHE_ENABLED: bool = True
+    ANALYSIS_CACHE_TTL_SECONDS: int = 86400
+    ANALYSIS_CACHE_MAX_ENTRIES: int = 2048
+    ANALYSIS_CACHE_REDIS_ENABLED: bool = True
+    ANALYSIS_CACHE_SEMANTIC_ENABLED: bool = False
+    ANALYSIS_CACHE_SEMANTIC_THRESHOLD: float = 0.97
+    TRANSLATION_BACKEND: str = "google"
+    TRANSLATION_MODEL_NAME: str = "Helsinki-NLP/opus-mt-tr-en"
+    TRANSLATION_CACHE_BACKEND: str = "sqlite"
+    TRANSLATION_CACHE_PATH: str = "cache/translations.sqlite3"
+    TRANSLATION_BATCH_SIZE: int = 16
+    TRANSLATION_MAX_BATCH_CHARS: int = 4500
+    CHROMA_EMBED_BATCH_SIZE: int = 64
+    CHROMA_UPSERT_BATCH_SIZE: int = 1000
+    CHROMA_UPSERT_RETRIES: int = 3
+    CHROMA_UPSERT_RETRY_BACKOFF: float = 1.0
+    TABLE_INGEST_WORKERS: int = 4
+    TABLE_ARTIFACT_FORMAT: str = ""
+    TABLE_ARTIFACT_DIR: str = "notification_htmls/tables"
+    HTML_PARSER_BACKEND: str = "lxml"
+    HTML_STREAMING_THRESHOLD_BYTES: int = 8000000
+    TABLE_PIPELINE_MODE: str = "process"
+    TABLE_PIPELINE_WORKERS: int = 4
+    TABLE_MAX_FAILURES: int = 3
+    KAP_BASE_URL: str = "https://www.kap.org.tr"
+    SCRAPER_CONCURRENCY: int = 4
+    SCRAPER_REQUESTS_PER_MINUTE: int = 120
+    SCRAPER_RATE_LIMIT_BURST: int = 2
+    SCRAPER_RETRIES: int = 3
+    SCRAPER_RETRY_BACKOFF: float = 1.0
+    SCRAPER_TIMEOUT: int = 30
+    NOTIFICATION_STORE_PATH: str = "cache/notifications.jsonl"
+    NOTIFICATION_STORE_BATCH_SIZE: int = 50
+    KAP_LISTING_QUERY: str = "srcbar=Y&cmp=Y&cat=4&s=4028328c594bfdca01594c0af9aa0057&st=Finansal%20Rapor&kw=bilan%C3%A7o&slf=FR"
+    KAP_LISTING_MAX_AGE_SECONDS: int = 300
+    HTTP_CACHE_ENABLED: bool = True
+    HTTP_CACHE_DIR: str = "cache/http"
+    HTTP_CACHE_TTL_SECONDS: int = 604800
+    CHUNKING_WORKERS: int = 4
+    CHUNKING_STRATEGY: str = "tokens"
+    CHUNK_TOKENIZER_NAME: str = ""
+    CHUNK_MAX_TOKENS: int = 256
+    CHUNK_OVERLAP_TOKENS: int = 32
+    CHUNK_TRANSLATION_UNIT_CHARS: int = 1500
+    CHUNK_TRUNCATION_REPORT: bool = True
+    EMBEDDING_DEDUP_ENABLED: bool = True
+    EMBEDDING_DEDUP_PATH: str = "cache/embeddings.sqlite3"
+    EMBEDDING_BACKEND: str = "torch"
+    EMBEDDING_ONNX_FILE: str = "onnx/model_quint8_avx2.onnx"
+    EMBEDDING_MAX_SEQ_LENGTH: int = 256
+    EMBEDDING_MAX_BATCH_SIZE: int = 64
+    EMBEDDING_MAX_WAIT_MS: int = 5
+    EMBEDDING_THREADS: int = 0
+    EMBEDDING_SERVICE_URL: str = "http://api:8001/embed"
+    QUERY_EMBEDDING_CACHE_MAX_ENTRIES: int = 4096
+    NOTIFICATION_INDEX_ENABLED: bool = True
+    NOTIFICATION_INDEX_PATH: str = "last_processed/notification_index.sqlite3"
+    NOTIFICATION_INDEX_FUZZY_CUTOFF: float = 0.8
+    NOTIFICATION_INDEX_MAX_IDS: int = 200
+    NOTIFICATION_INDEX_MAX_COMPANIES: int = 3
+    CHROMA_QUERY_COALESCE_ENABLED: bool = True
+    CHROMA_QUERY_COALESCE_WINDOW_MS: int = 3
+    CHROMA_QUERY_COALESCE_MAX_BATCH: int = 32
 
     @property
     def REDIS_URL(self) -> str:
         return f"redis://redis:{self.REDIS_PORT}/0"
+
+    @property
+    def KAP_LISTING_URL(self) -> str:
+        return f"{self.KAP_BASE_URL}/tr/bildirim-sorgu-sonuc?{self.KAP_LISTING_QUERY}"
     
     class Config:
         env_file = ".env"
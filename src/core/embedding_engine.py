@@ -0,0 +1,341 @@
+import logging
+import os
+import queue
+import threading
+import time
+import numpy as np
+from chromadb.api.types import Documents, EmbeddingFunction
+from chromadb.utils.embedding_functions import register_embedding_function
+from .cache import LRUCache
+from .config import config
+
+logger = logging.getLogger(__name__)
+
+_engine = None
+_engine_lock = threading.Lock()
+_query_embedding_function = None
+
+
+def model_repo(model_name):
+    return model_name if '/' in model_name else f"sentence-transformers/{model_name}"
+
+
+def embedding_model_id():
+    # Vectors from different backends are close but not identical, so caches key on the backend too.
+    if config.EMBEDDING_BACKEND == "onnx":
+        return f"{config.EMBEDDING_MODEL_NAME}:{config.EMBEDDING_ONNX_FILE}"
+    return config.EMBEDDING_MODEL_NAME
+
+
+class SentenceTransformerBackend:
+    name = "torch"
+
+    def __init__(self, model_name, max_seq_length=None, batch_size=64):
+        from sentence_transformers import SentenceTransformer
+        self.model = SentenceTransformer(model_name, device="cpu")
+        if max_seq_length:
+            self.model.max_seq_length = max_seq_length
+        self.batch_size = batch_size
+
+    def encode(self, texts):
+        embeddings = self.model.encode(list(texts), batch_size=self.batch_size, convert_to_numpy=True)
+        return [np.asarray(embedding, dtype=np.float32) for embedding in embeddings]
+
+
+class OnnxBackend:
+    """ONNX Runtime export of the sentence-transformers model: mean pooling plus L2 normalization,
+    matching the model's own Pooling and Normalize modules."""
+
+    name = "onnx"
+
+    def __init__(self, model_name, onnx_file, max_seq_length=256, batch_size=64, threads=0):
+        import onnxruntime as ort
+        from huggingface_hub import hf_hub_download
+        from tokenizers import Tokenizer
+
+        repo = model_repo(model_name)
+        self.tokenizer = Tokenizer.from_file(hf_hub_download(repo, "tokenizer.json"))
+        self.tokenizer.enable_truncation(max_length=max_seq_length)
+        self.tokenizer.enable_padding()
+        options = ort.SessionOptions()
+        if threads:
+            options.intra_op_num_threads = threads
+        self.session = ort.InferenceSession(hf_hub_download(repo, onnx_file), options, providers=["CPUExecutionProvider"])
+        self.input_names = {model_input.name for model_input in self.session.get_inputs()}
+        self.batch_size = batch_size
+
+    def _encode_batch(self, texts):
+        encodings = self.tokenizer.encode_batch(texts)
+        input_ids = np.array([encoding.ids for encoding in encodings], dtype=np.int64)
+        attention_mask = np.array([encoding.attention_mask for encoding in encodings], dtype=np.int64)
+        feeds = {"input_ids": input_ids, "attention_mask": attention_mask}
+        if "token_type_ids" in self.input_names:
+            feeds["token_type_ids"] = np.zeros_like(input_ids)
+
+        token_embeddings = self.session.run(None, feeds)[0]
+        mask = attention_mask[..., None].astype(np.float32)
+        pooled = (token_embeddings * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+        return pooled / np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+
+    def encode(self, texts):
+        embeddings = []
+        for start in range(0, len(texts), self.batch_size):
+            embeddings.extend(self._encode_batch(list(texts[start:start + self.batch_size])).astype(np.float32))
+        return embeddings
+
+
+class RemoteBackend:
+    """Delegates to the API's /embed endpoint so workers share the engine loaded there."""
+
+    name = "remote"
+
+    def __init__(self, url, timeout=60):
+        import requests
+        self.session = requests.Session()
+        self.url = url
+        self.timeout = timeout
+
+    def encode(self, texts):
+        response = self.session.post(self.url, json={"texts": list(texts)}, timeout=self.timeout)
+        response.raise_for_status()
+        return [np.asarray(embedding, dtype=np.float32) for embedding in response.json()["embeddings"]]
+
+
+class _EmbedRequest:
+    def __init__(self, texts):
+        self.texts = texts
+        self.result = None
+        self.error = None
+        self.done = threading.Event()
+
+
+class EmbeddingEngine:
+    """Loads one backend per process and micro-batches concurrent embed calls.
+
+    A batch is closed when it reaches max_batch_size texts or max_wait_ms after its first
+    request, whichever comes first.
+    """
+
+    def __init__(self, backend, max_batch_size=64, max_wait_ms=5):
+        self.backend = backend
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait_ms / 1000.0
+        self._lock = threading.Lock()
+        self._queue = None
+        self._pid = None
+        self._stats = {"requests": 0, "texts": 0, "batches": 0, "errors": 0, "encode_seconds": 0.0}
+
+    def _ensure_worker(self):
+        # The worker thread does not survive fork, so a forked child starts its own.
+        with self._lock:
+            if self._pid != os.getpid():
+                self._queue = queue.Queue()
+                self._pid = os.getpid()
+                threading.Thread(target=self._run, args=(self._queue,), name="embedding-engine", daemon=True).start()
+            return self._queue
+
+    def _collect(self, work_queue):
+        batch = [work_queue.get()]
+        size = len(batch[0].texts)
+        deadline = time.monotonic() + self.max_wait
+        while size < self.max_batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                request = work_queue.get(timeout=timeout)
+            except queue.Empty:
+                break
+            batch.append(request)
+            size += len(request.texts)
+        return batch
+
+    def _run(self, work_queue):
+        while True:
+            batch = self._collect(work_queue)
+            texts = [text for request in batch for text in request.texts]
+            started = time.perf_counter()
+            try:
+                embeddings = self.backend.encode(texts)
+                offset = 0
+                for request in batch:
+                    request.result = embeddings[offset:offset + len(request.texts)]
+                    offset += len(request.texts)
+            except Exception as e:
+                logger.error(f"Embedding batch of {len(texts)} texts failed: {e}")
+                for request in batch:
+                    request.error = e
+            finally:
+                with self._lock:
+                    self._stats["batches"] += 1
+                    self._stats["texts"] += len(texts)
+                    self._stats["encode_seconds"] += time.perf_counter() - started
+                    self._stats["errors"] += sum(1 for request in batch if request.error)
+                for request in batch:
+                    request.done.set()
+
+    def embed(self, texts):
+        texts = list(texts)
+        if not texts:
+            return []
+        request = _EmbedRequest(texts)
+        with self._lock:
+            self._stats["requests"] += 1
+        self._ensure_worker().put(request)
+        request.done.wait()
+        if request.error is not None:
+            raise request.error
+        return request.result
+
+    def stats(self):
+        with self._lock:
+            batches = self._stats["batches"]
+            return {
+                "backend": self.backend.name,
+                "model": embedding_model_id(),
+                **self._stats,
+                "encode_seconds": round(self._stats["encode_seconds"], 3),
+                "avg_batch_size": round(self._stats["texts"] / batches, 1) if batches else 0.0,
+                "texts_per_second": round(self._stats["texts"] / self._stats["encode_seconds"], 1) if self._stats["encode_seconds"] else 0.0
+            }
+
+
+class EngineEmbeddingFunction(EmbeddingFunction[Documents]):
+    """Chroma embedding function backed by the shared EmbeddingEngine.
+
+    It is registered under the name of Chroma's sentence-transformer function and keeps its config
+    format. Collections created by the previous code are therefore rebuilt with this function
+    instead of loading a second copy of the model.
+    """
+
+    def __init__(self, engine=None, model_name=None):
+        self.engine = engine
+        self.model_name = model_name or config.EMBEDDING_MODEL_NAME
+
+    def __call__(self, input: Documents):
+        engine = self.engine or get_embedding_engine()
+        return engine.embed(input)
+
+    @staticmethod
+    def name():
+        return "sentence_transformer"
+
+    def default_space(self):
+        return "cosine"
+
+    def supported_spaces(self):
+        return ["cosine", "l2", "ip"]
+
+    @staticmethod
+    def build_from_config(config_dict):
+        model_name = config_dict.get("model_name")
+        if model_name and model_name != config.EMBEDDING_MODEL_NAME:
+            logger.warning(f"Collection was created with '{model_name}', embedding with '{config.EMBEDDING_MODEL_NAME}'")
+        return get_query_embedding_function()
+
+    def get_config(self):
+        return {"model_name": self.model_name, "device": "cpu", "normalize_embeddings": False, "kwargs": {}}
+
+
+class CachedEmbeddingFunction(EngineEmbeddingFunction):
+    """Engine embedding function with an LRU of text -> vector for query texts.
+
+    Texts passed to precompute are pinned and never evicted; search probes such as "" are
+    embedded on almost every request.
+    """
+
+    def __init__(self, engine=None, max_entries=None):
+        super().__init__(engine)
+        self.cache = LRUCache(max_entries or config.QUERY_EMBEDDING_CACHE_MAX_ENTRIES, name="query_embedding")
+        self.pinned = {}
+        self._lock = threading.Lock()
+        self._pinned_hits = 0
+
+    def _embed(self, texts):
+        engine = self.engine or get_embedding_engine()
+        return engine.embed(texts)
+
+    def precompute(self, texts):
+        texts = list(dict.fromkeys(texts))
+        if texts:
+            self.pinned.update(zip(texts, self._embed(texts)))
+
+    def __call__(self, input: Documents):
+        embeddings = [None] * len(input)
+        missing = {}
+        pinned_hits = 0
+        for i, text in enumerate(input):
+            embedding = self.pinned.get(text)
+            if embedding is not None:
+                pinned_hits += 1
+            else:
+                embedding = self.cache.get(text)
+            if embedding is None:
+                missing.setdefault(text, []).append(i)
+            embeddings[i] = embedding
+
+        if pinned_hits:
+            with self._lock:
+                self._pinned_hits += pinned_hits
+        if missing:
+            for text, embedding in zip(missing, self._embed(list(missing))):
+                self.cache.set(text, embedding)
+                for i in missing[text]:
+                    embeddings[i] = embedding
+        return embeddings
+
+    def stats(self):
+        stats = self.cache.stats()
+        with self._lock:
+            pinned_hits = self._pinned_hits
+        lookups = stats["hits"] + stats["misses"] + pinned_hits
+        stats.update({
+            "pinned": len(self.pinned),
+            "pinned_hits": pinned_hits,
+            "hit_rate": round((stats["hits"] + pinned_hits) / lookups, 4) if lookups else 0.0
+        })
+        return stats
+
+
+register_embedding_function(EngineEmbeddingFunction)
+
+
+def create_embedding_backend(name):
+    if name == "onnx":
+        return OnnxBackend(
+            config.EMBEDDING_MODEL_NAME,
+            config.EMBEDDING_ONNX_FILE,
+            max_seq_length=config.EMBEDDING_MAX_SEQ_LENGTH,
+            batch_size=config.EMBEDDING_MAX_BATCH_SIZE,
+            threads=config.EMBEDDING_THREADS
+        )
+    if name == "remote":
+        return RemoteBackend(config.EMBEDDING_SERVICE_URL)
+    return SentenceTransformerBackend(
+        config.EMBEDDING_MODEL_NAME,
+        max_seq_length=config.EMBEDDING_MAX_SEQ_LENGTH,
+        batch_size=config.EMBEDDING_MAX_BATCH_SIZE
+    )
+
+
+def get_embedding_engine():
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = EmbeddingEngine(
+                    create_embedding_backend(config.EMBEDDING_BACKEND),
+                    max_batch_size=config.EMBEDDING_MAX_BATCH_SIZE,
+                    max_wait_ms=config.EMBEDDING_MAX_WAIT_MS
+                )
+                logger.info(f"Embedding engine loaded '{embedding_model_id()}' with the {config.EMBEDDING_BACKEND} backend")
+    return _engine
+
+
+def get_query_embedding_function():
+    global _query_embedding_function
+    if _query_embedding_function is None:
+        with _engine_lock:
+            if _query_embedding_function is None:
+                _query_embedding_function = CachedEmbeddingFunction()
+    return _query_embedding_function
@@ -0,0 +1,117 @@
+import logging
+import threading
+import time
+from .config import config
+from .client import RedisClient
+
+logger = logging.getLogger(__name__)
+
+_REDIS_TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate) - 1
+local wait = 0
+if tokens < 0 then
+    wait = -tokens / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 60)
+return tostring(wait)
+"""
+
+
+class TokenBucketRateLimiter:
+    def __init__(self, requests_per_minute, burst=1, name="llm"):
+        if requests_per_minute <= 0:
+            raise ValueError("requests_per_minute must be positive")
+        self.name = name
+        self.rate = requests_per_minute / 60.0
+        self.capacity = max(1, burst)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+        self._acquired = 0
+        self._delayed = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+        self._last_wait = 0.0
+
+    def _reserve(self):
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate) - 1
+            self._updated = now
+            return -self._tokens / self.rate if self._tokens < 0 else 0.0
+
+    def acquire(self):
+        wait = self._reserve()
+        if wait > 0:
+            time.sleep(wait)
+        self._record(wait)
+        return wait
+
+    def _record(self, wait):
+        with self._lock:
+            self._acquired += 1
+            self._last_wait = wait
+            if wait > 0:
+                self._delayed += 1
+                self._total_wait += wait
+                self._max_wait = max(self._max_wait, wait)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "name": self.name,
+                "backend": self.backend,
+                "requests_per_minute": self.rate * 60,
+                "burst": self.capacity,
+                "acquired": self._acquired,
+                "delayed": self._delayed,
+                "total_wait_seconds": round(self._total_wait, 3),
+                "avg_wait_seconds": round(self._total_wait / self._acquired, 3) if self._acquired else 0.0,
+                "max_wait_seconds": round(self._max_wait, 3),
+                "last_wait_seconds": round(self._last_wait, 3)
+            }
+
+    @property
+    def backend(self):
+        return "local"
+
+
+class RedisTokenBucketRateLimiter(TokenBucketRateLimiter):
+    def __init__(self, requests_per_minute, burst=1, name="llm"):
+        super().__init__(requests_per_minute, burst=burst, name=name)
+        self.key = f"kap:rate_limit:{name}"
+        self.redis = RedisClient().client
+        self._script = self.redis.register_script(_REDIS_TOKEN_BUCKET_SCRIPT)
+
+    def _reserve(self):
+        try:
+            return float(self._script(keys=[self.key], args=[self.rate, self.capacity]))
+        except Exception as e:
+            logger.warning(f"Redis rate limiter unavailable, using local bucket: {e}")
+            return super()._reserve()
+
+    @property
+    def backend(self):
+        return "redis"
+
+
+def create_rate_limiter(name, requests_per_minute, burst, backend):
+    if backend == "redis":
+        return RedisTokenBucketRateLimiter(requests_per_minute, burst=burst, name=name)
+    return TokenBucketRateLimiter(requests_per_minute, burst=burst, name=name)
+
+
+llm_rate_limiter = create_rate_limiter(
+    "llm",
+    config.LLM_REQUESTS_PER_MINUTE,
+    config.LLM_RATE_LIMIT_BURST,
+    config.LLM_RATE_LIMIT_BACKEND
+)
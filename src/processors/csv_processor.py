@@ -1,8 +1,14 @@
 import logging
 import os
+import time
+from functools import partial
 import pandas as pd
+from ..core.config import config
+from ..core.concurrency import create_process_pool
 from ..utils.file_handler import delete_file
-from ..utils.split_text import split_text_into_sentences
+from ..utils.notification_store import NotificationStore
+from ..utils.split_text import chunk_text, pack_token_chunks, translate_chunks, translation_units
+from ..utils.token_chunker import get_token_chunker
 from ..services.chroma_content_service import ChromaContentService
 
 logger = logging.getLogger(__name__)
@@ -10,71 +16,157 @@ logger = logging.getLogger(__name__)
 class CSVProcessor:
     def __init__(self):
         self.chroma_service = ChromaContentService()
+        self.store = NotificationStore()
+        self._totals = {
+            "notifications": 0, "chunks": 0, "seconds": 0.0, "tokens": 0, "truncated_tokens": 0, "truncated_chunks": 0,
+            "filled_tokens": 0, "token_capacity": 0
+        }
 
-    def process_csv(self):
-        processed_file = 'header_content_processed.csv'
-        if os.path.exists(processed_file):
-            logger.info("Found existing processed file. Skipping processing to avoid duplicates.")
-            return
+    def _import_legacy_csv(self, csv_file):
+        # header_content.csv left over from the batch scraper is moved into the store once.
+        df = pd.read_csv(csv_file)
+        for record in df.to_dict(orient='records'):
+            self.store.append({key: (None if pd.isna(value) else value) for key, value in record.items()})
+        delete_file(csv_file)
+        logger.info(f"Imported {len(df)} notifications from {csv_file} into the notification store")
 
-        csv_file = 'header_content.csv'
-        if not os.path.exists(csv_file):
-            logger.info("No CSV file to process")
-            return
+    def _map(self, func, items):
+        workers = config.CHUNKING_WORKERS
+        if workers <= 1 or len(items) < 2 * workers:
+            return [func(item) for item in items]
+        if config.CHUNKING_STRATEGY == "tokens":
+            # Load the tokenizer before forking so workers inherit it instead of each loading their own.
+            get_token_chunker()
+        with create_process_pool(workers) as executor:
+            return list(executor.map(func, items, chunksize=max(1, len(items) // (4 * workers))))
 
-        df = pd.read_csv(csv_file)
-        if df.empty:
-            logger.info("CSV file is empty")
+    def split_contents(self, contents):
+        # Token chunks are packed after translation, so the source is only cut into sentence runs here.
+        token_strategy = config.CHUNKING_STRATEGY == "tokens"
+        return self._map(translation_units if token_strategy else partial(chunk_text, translate=False), contents)
+
+    def chunk_records(self, records):
+        started = time.perf_counter()
+        chunk_lists = self.split_contents([record['content'] for record in records])
+        split_seconds = time.perf_counter() - started
+
+        # One translate call for the whole batch lets the service spread it over its thread pool.
+        translated = iter(translate_chunks([chunk for chunks in chunk_lists for chunk in chunks]))
+        chunk_lists = [[next(translated) for _ in chunks] for chunks in chunk_lists]
+        translate_seconds = time.perf_counter() - started - split_seconds
+
+        if config.CHUNKING_STRATEGY == "tokens":
+            chunk_lists = self._map(pack_token_chunks, chunk_lists)
+
+        seconds = time.perf_counter() - started
+        chunk_count = sum(len(chunks) for chunks in chunk_lists)
+        if config.CHUNK_TRUNCATION_REPORT:
+            self.record_truncation([chunk for chunks in chunk_lists for chunk in chunks])
+        self._totals["notifications"] += len(records)
+        self._totals["chunks"] += chunk_count
+        self._totals["seconds"] += seconds
+        logger.info(
+            f"Chunked {len(records)} notifications into {chunk_count} chunks in {seconds:.2f}s "
+            f"({chunk_count / seconds if seconds else 0.0:.1f} chunks/sec; split {split_seconds:.2f}s, "
+            f"translate {translate_seconds:.2f}s, pack {seconds - split_seconds - translate_seconds:.2f}s)"
+        )
+        return chunk_lists
+
+    def record_truncation(self, chunks):
+        # Measured on the translated text, which is what the embedding model actually sees.
+        try:
+            report = get_token_chunker().truncation_report(chunks)
+        except Exception as e:
+            logger.warning(f"Could not measure chunk truncation: {e}")
             return
-            
-        last_processed_id = self.chroma_service.load_last_processed()
-            
-        if last_processed_id:
-            df = df[df['id'] > last_processed_id]
-            if df.empty:
-                logger.info("No new notifications to process")
-                return
+        self._totals["tokens"] += report["tokens"]
+        self._totals["truncated_tokens"] += report["truncated_tokens"]
+        self._totals["truncated_chunks"] += report["truncated_texts"]
+        self._totals["filled_tokens"] += report["filled_tokens"]
+        self._totals["token_capacity"] += report["texts"] * report["budget"]
+        logger.info(f"Chunks fill {report['fill_ratio']:.1%} of the {report['budget']} token budget on average")
+        if report["truncated_tokens"]:
+            logger.warning(
+                f"{report['truncated_texts']} of {report['texts']} chunks exceed {get_token_chunker().max_tokens} tokens, "
+                f"{report['truncated_tokens']} of {report['tokens']} tokens will be truncated at embed time"
+            )
 
-        all_processed_docs = []
-            
-        for _, row in df.iterrows():
-            title_doc = {
+    def throughput(self):
+        seconds = self._totals["seconds"]
+        return {
+            **self._totals,
+            "seconds": round(seconds, 3),
+            "chunks_per_second": round(self._totals["chunks"] / seconds, 1) if seconds else 0.0,
+            "truncated_ratio": round(self._totals["truncated_tokens"] / self._totals["tokens"], 4) if self._totals["tokens"] else 0.0,
+            "fill_ratio": round(self._totals["filled_tokens"] / self._totals["token_capacity"], 4) if self._totals["token_capacity"] else 0.0
+        }
+
+    def build_documents(self, row, content_chunks):
+        title_doc = {
+            'title': row['title'],
+            'content': '',
+            'is_title': True,
+            'history': row['history'],
+            'period': row['period'],
+            'notification_id': row['id'],
+            'chunk_index': 0,
+            'total_chunks': 0
+        }
+
+        documents = []
+        for i, chunk in enumerate(content_chunks, 1):
+            content_doc = {
                 'title': row['title'],
-                'content': '',
-                'is_title': True,
+                'content': chunk,
+                'is_title': False,
+                'notification_id': row['id'],
                 'history': row['history'],
                 'period': row['period'],
-                'notification_id': row['id'],
-                'chunk_index': 0,
-                'total_chunks': 0
+                'chunk_index': i,
+                'total_chunks': len(content_chunks)
             }
+            documents.append(content_doc)
+        documents.append(title_doc)
+        return documents
+
+    def process_batch(self, records, last_processed_id):
+        all_processed_docs = []
+        records = [record for record in records if not last_processed_id or int(record['id']) > last_processed_id]
+        if not records:
+            return 0
+
+        for row, content_chunks in zip(records, self.chunk_records(records)):
+            all_processed_docs.extend(self.build_documents(row, content_chunks))
+
+        if not all_processed_docs:
+            return 0
+
+        processed_df = pd.DataFrame(all_processed_docs)
+        processed_df.to_csv('header_content_processed.csv', index=False, encoding='utf-8-sig')
 
-            content_chunks = split_text_into_sentences(row['content'])
-                
-            for i, chunk in enumerate(content_chunks, 1):
-                content_doc = {
-                    'title': row['title'],
-                    'content': chunk,
-                    'is_title': False,
-                    'notification_id': row['id'],
-                    'history': row['history'],
-                    'period': row['period'],
-                    'chunk_index': i,
-                    'total_chunks': len(content_chunks)
-                }
-                all_processed_docs.append(content_doc)
-            all_processed_docs.append(title_doc)
-
-        if all_processed_docs:
-            processed_df = pd.DataFrame(all_processed_docs)
-            processed_df.to_csv('header_content_processed.csv', index=False, encoding='utf-8-sig')
-
-            logger.info(f"Processed {len(all_processed_docs)} chunks from {len(df)} notifications")
+        logger.info(f"Processed {len(all_processed_docs)} chunks from {len(records)} notifications")
 
+        self.chroma_service.save_to_chroma_content()
+        return len(records)
+
+    def process_csv(self):
+        processed_file = 'header_content_processed.csv'
+        if os.path.exists(processed_file):
+            logger.info("Found existing processed file from an interrupted run. Saving it before reading new notifications.")
             self.chroma_service.save_to_chroma_content()
 
-            delete_file(csv_file)
-        else:
-            logger.info("No data to process")
+        csv_file = 'header_content.csv'
+        if os.path.exists(csv_file):
+            self._import_legacy_csv(csv_file)
 
+        total = 0
+        for offset, records in self.store.iter_batches():
+            # The cursor is re-read per batch, since each saved batch advances it.
+            total += self.process_batch(records, self.chroma_service.load_last_processed())
+            self.store.commit(offset)
 
+        self.store.compact()
+        if total:
+            logger.info(f"Processed {total} notifications from the notification store, throughput: {self.throughput()}")
+        else:
+            logger.info("No new notifications to process")
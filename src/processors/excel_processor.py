@@ -3,15 +3,18 @@ import os
 import glob
 import pandas as pd
 import numpy as np
-from bs4 import BeautifulSoup
-import time
+from ..core.config import config
 from .table_chunk import TableChunk
+from .html_table_parser import create_table_parser
+from ..utils.table_frame import excel_round_trip
+from .table_pipeline import TablePipeline
 
 logger = logging.getLogger(__name__)
 
 class ExcelProcessor:
-    def __init__(self):
-        self.table_chunk = TableChunk()
+    def __init__(self, with_storage=True):
+        self.table_chunk = TableChunk() if with_storage else None
+        self.table_parser = create_table_parser(config.HTML_PARSER_BACKEND)
 
     def process_tables(self):
         try:
@@ -20,20 +23,13 @@ class ExcelProcessor:
                 logger.warning("No HTML files found to process.")
                 return {"status": "success", "message": "No HTML files to process"}
 
-            for html_file in html_files:
-                try:
-                    notification_id = os.path.basename(html_file).replace('.html', '')
-                    logger.info(f"Processing notification: {notification_id}")
-                            
-                    html_content = self.get_data_from_html(html_file)
-                    if html_content:
-                        self.extract_table_data(html_content, notification_id)
-                        self.table_chunk.process_table_chunks()
-                except Exception as e:
-                    logger.error(f"{html_file} processing error: {e}")
-                    continue
-
-            return {"status": "success", "message": "Excel processing completed"}
+            if config.TABLE_PIPELINE_MODE == "celery":
+                from ..tasks.table_tasks import dispatch_table_files
+                dispatch_table_files(html_files)
+                return {"status": "success", "message": f"Dispatched {len(html_files)} HTML files for table processing"}
+
+            report = TablePipeline(self).run(html_files)
+            return {"status": "success", "message": "Excel processing completed", "report": report}
         except Exception as e:
             logger.error(f"Excel processing error: {e}")
             return {"status": "error", "message": str(e)}
@@ -54,53 +50,27 @@ class ExcelProcessor:
         with open(html_file, 'r', encoding='utf-8') as file:
             return file.read()
 
-    def is_complex_table(self, table):
-        for row in table.find_all('tr'):
-            for cell in row.find_all(['td', 'th']):
-                colspan = cell.get('colspan')
-                rowspan = cell.get('rowspan')
-                if colspan and (colspan.strip() == "0" or int(colspan.strip()) > 3):
-                    return True
-                if rowspan and (rowspan.strip() == "0" or int(rowspan.strip()) > 3):
-                    return True
-        return False
-
     def process_table_data(self, table_data, notification_id, table_count):
         try:
             if not table_data:
-                return
+                return None
                 
             df = pd.DataFrame(table_data)
-            temp_file = f'notification_htmls/{notification_id}_tab_{table_count}.xlsx'
             
             for col in df.columns:
                 df[col] = df[col].astype(str)
                 
-            df.to_excel(temp_file, index=False, engine="openpyxl")
-            time.sleep(0.1)  
-            if not os.path.exists(temp_file):
-                logger.warning("Retrying file check after delay...")
-                time.sleep(0.3)  
-                if not os.path.exists(temp_file):
-                    logger.error(f"Temporary file creation error: {temp_file}")
-                    return
-                
-            df = pd.read_excel(temp_file)
+            df = excel_round_trip(df)
             
             if df.shape[0] < 3:
-                os.remove(temp_file)
-                return
+                return None
                 
             same_mask = df[df.columns[1]] == df[df.columns[3]]
             df.loc[same_mask, df.columns[3]] = pd.NA
             
             df = df.drop_duplicates(subset=[df.columns[1], df.columns[2]], keep='first')
             
-            col1_non_empty = df.iloc[:, 1].notna() & (df.iloc[:, 1] != "")
-            other_cols = df.drop(df.columns[1], axis=1)
-            other_cols_empty_or_nan = other_cols.apply(lambda col: col.map(lambda x: pd.isna(x) or x == ""))
-            only_col1_has_data = col1_non_empty & other_cols_empty_or_nan.all(axis=1)
-            df = df[~only_col1_has_data] 
+            df = df[~self.only_second_column_has_data(df)]
             
             if df.shape[0] > 4:
                 df = self.process_tc_fc_data(df)
@@ -116,27 +86,40 @@ class ExcelProcessor:
                     "NaT": ""
                 })
                 
-                for idx in df.index:
-                    row_values = df.iloc[idx].values  
-                    non_empty_values = [val for val in row_values if val and val.strip() and val.lower() not in ["nan", "<na>", "none", "nat"]] 
-                    padded_values = non_empty_values + [""] * (len(row_values) - len(non_empty_values))  
-                    df.iloc[idx] = padded_values
+                df = self.compact_rows(df)
                 df = df.loc[:, (df != "").any(axis=0)]
-                final_file = f'notification_htmls/{notification_id}_table_{table_count}.xlsx'
-                df.to_excel(final_file, index=False)
+                return excel_round_trip(df)
             else:
-                os.remove(temp_file)
-                return
-                
-            if os.path.exists(temp_file):
-                os.remove(temp_file)
-            if os.path.exists(f'notification_htmls/{notification_id}.html'):
-                os.remove(f'notification_htmls/{notification_id}.html')
+                return None
             
         except Exception as e:
-            logger.error(f"Table processing error: {e}")
-            if os.path.exists(temp_file):
-                os.remove(temp_file)
+            logger.error(f"Table processing error ({notification_id}, table {table_count}): {e}")
+            return None
+
+    def only_second_column_has_data(self, df):
+        col1_non_empty = df.iloc[:, 1].notna() & (df.iloc[:, 1] != "")
+        other_cols = df.drop(df.columns[1], axis=1)
+        other_cols_empty_or_nan = other_cols.isna() | other_cols.eq("")
+        return col1_non_empty & other_cols_empty_or_nan.all(axis=1)
+
+    def compact_rows(self, df):
+        # Rows are addressed by position using the index labels, as the former
+        # row-by-row loop did; labels outside the frame reject the table.
+        positions = df.index.to_numpy()
+        if len(positions) and (positions.max() >= len(df) or positions.min() < -len(df)):
+            raise IndexError("single positional indexer is out-of-bounds")
+        rows = np.unique(positions % len(df)) if len(df) else positions
+
+        values = df.to_numpy(dtype=str)
+        selected = values[rows]
+        non_empty = (np.char.strip(selected) != "") & ~np.isin(np.char.lower(selected), ["nan", "<na>", "none", "nat"])
+        order = np.argsort(~non_empty, axis=1, kind="stable")
+        compacted = np.take_along_axis(selected, order, axis=1)
+        compacted[np.arange(values.shape[1]) >= non_empty.sum(axis=1)[:, None]] = ""
+
+        result = df.to_numpy(dtype=object)
+        result[rows] = compacted
+        return pd.DataFrame(result, index=df.index, columns=df.columns)
 
     def process_tc_fc_data(self, df):
         try:
@@ -147,26 +130,22 @@ class ExcelProcessor:
             shifted_values = shifted_values.astype(str)  
             df.iloc[2] = shifted_values
             
-            tc_fc_exists = any(str(val).strip() in ["TC", "FC", "Total"] 
-                            for val in df.iloc[3].values if pd.notna(val))
+            tc_fc_values = np.char.strip(df.iloc[3].to_numpy(dtype=str))
+            tc_fc_mask = np.isin(tc_fc_values, ["TC", "FC", "Total"])
 
-            if tc_fc_exists:
+            if tc_fc_mask.any():
                 tc_fc_row_idx = 3
                 info_row_idx = 2
                 
                 second_info = str(df.iloc[info_row_idx, 6]) if pd.notna(df.iloc[info_row_idx, 6]) else ""
                 third_info = str(df.iloc[info_row_idx, 7]) if pd.notna(df.iloc[info_row_idx, 7]) else ""
                 
-                for col in range(df.shape[1]):
-                    value = str(df.iloc[tc_fc_row_idx, col]).strip()
-                    if value in ["TC", "FC", "Total"]:
-                        if col < 4:  
-                            df.iloc[tc_fc_row_idx, col] = f"{value}({second_info})"
-                        else:        
-                            df.iloc[tc_fc_row_idx, col] = f"{value}({third_info})"
-                shifted_values = np.concatenate((["", "", "", "", ""], df.iloc[3].values[:-5]))
+                info = np.where(np.arange(df.shape[1]) < 4, second_info, third_info)
+                labelled = np.char.add(np.char.add(tc_fc_values, "("), np.char.add(info, ")"))
+                row_values = np.where(tc_fc_mask, labelled, df.iloc[tc_fc_row_idx].to_numpy(dtype=str))
+                shifted_values = np.concatenate((["", "", "", "", ""], row_values[:-5]))
                 shifted_values = shifted_values.astype(str) 
-                df.iloc[3] = shifted_values         
+                df.iloc[tc_fc_row_idx] = shifted_values         
                 df = df.drop(index=info_row_idx).reset_index(drop=True)
             return df
 
@@ -176,14 +155,20 @@ class ExcelProcessor:
 
     def process_header(self, df):
         try:
-            for col in range(df.shape[1]):
-                header_note = str(df.iloc[2, col]).strip()
-                if header_note and header_note.lower() != "nan":
-                    for row in range(3, df.shape[0]):
-                        current_value = str(df.iloc[row, col]).strip()
-                        if current_value and current_value.lower() != "nan":
-                            df.iloc[row, col] = f"{current_value} ({header_note})"
+            values = df.to_numpy(dtype=object)
+            text = values.astype(str)
+
+            header_notes = np.char.strip(text[2])
+            has_note = (header_notes != "") & (np.char.lower(header_notes) != "nan")
+            current_values = np.char.strip(text[3:])
+            has_value = (current_values != "") & (np.char.lower(current_values) != "nan")
 
+            update_mask = has_value & has_note
+            suffixed = np.char.add(np.char.add(current_values, " ("), np.char.add(header_notes, ")"))
+            body = values[3:]
+            body[update_mask] = suffixed[update_mask]
+
+            df = pd.DataFrame(values, index=df.index, columns=df.columns)
             df = df.drop(index=2).reset_index(drop=True)
             return df
 
@@ -191,45 +176,39 @@ class ExcelProcessor:
             logger.error(f"Header processing error: {e}")
             return df
 
-    def extract_table_data(self, html, notification_id):
-        if not html:
-            logger.error(f"HTML content is empty: {notification_id}")
-            return
-            
-        soup = BeautifulSoup(html, 'html.parser')
-        tables = soup.find_all('table')
+    def _collect_tables(self, parsed_tables, notification_id):
         table_count = 0
         current_table_data = []
+        tables = []
         
-        for table in tables:
-            if self.is_complex_table(table):
-                logger.info(f"Complex table.")
-                continue
-                    
-            if 'financial-header-table' in table.get('class', []) and current_table_data:
-                self.process_table_data(current_table_data, notification_id, table_count)
+        for is_header_table, table_data in parsed_tables:
+            if is_header_table and current_table_data:
+                tables.append((table_count, self.process_table_data(current_table_data, notification_id, table_count)))
                 table_count += 1
                 current_table_data = []
                 
-            table_data = []
-            rows = table.find_all('tr')
-                
-            for row in rows:
-                cols = []
-                for cell in row.find_all(['td', 'th']):
-                    if cell.find('div', class_='taxonomy-footnote-value'):
-                        continue
-                            
-                    span = cell.find('span')
-                    cell_text = span.get_text(strip=True) if span else cell.get_text(strip=True)
-                    cols.append(cell_text or "")
-                    
-                if cols:
-                    table_data.append(cols)
-                
             if table_data:
                 current_table_data.extend(table_data)
             
         if current_table_data:
-            self.process_table_data(current_table_data, notification_id, table_count)
-                
\ No newline at end of file
+            tables.append((table_count, self.process_table_data(current_table_data, notification_id, table_count)))
+
+        return [(table_num, df) for table_num, df in tables if df is not None]
+
+    def extract_table_data(self, html, notification_id):
+        if not html:
+            logger.error(f"HTML content is empty: {notification_id}")
+            return []
+            
+        return self._collect_tables(self.table_parser.iter_tables(html), notification_id)
+
+    def extract_tables_from_file(self, html_file, notification_id):
+        if not os.path.exists(html_file):
+            logger.error(f"HTML file not found: {html_file}")
+            return []
+
+        if self.table_parser.supports_streaming and os.path.getsize(html_file) >= config.HTML_STREAMING_THRESHOLD_BYTES:
+            logger.info(f"Streaming large HTML file: {html_file}")
+            return self._collect_tables(self.table_parser.iter_tables_from_file(html_file), notification_id)
+
+        return self.extract_table_data(self.get_data_from_html(html_file), notification_id)
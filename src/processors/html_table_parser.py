@@ -0,0 +1,137 @@
+import itertools
+import logging
+from bs4 import BeautifulSoup
+
+try:
+    from lxml import etree
+except ImportError:
+    etree = None
+
+logger = logging.getLogger(__name__)
+
+HEADER_TABLE_CLASS = 'financial-header-table'
+FOOTNOTE_CLASS = 'taxonomy-footnote-value'
+_SKIPPED_TEXT_TAGS = {'script', 'style', 'template'}
+
+
+def _is_complex_span(value):
+    return bool(value) and (value.strip() == "0" or int(value.strip()) > 3)
+
+
+class BeautifulSoupTableParser:
+    name = "bs4"
+    supports_streaming = False
+
+    def __init__(self, features='html.parser'):
+        self.features = features
+
+    def is_complex_table(self, table):
+        for row in table.find_all('tr'):
+            for cell in row.find_all(['td', 'th']):
+                if _is_complex_span(cell.get('colspan')) or _is_complex_span(cell.get('rowspan')):
+                    return True
+        return False
+
+    def _table_rows(self, table):
+        table_data = []
+        for row in table.find_all('tr'):
+            cols = []
+            for cell in row.find_all(['td', 'th']):
+                if cell.find('div', class_=FOOTNOTE_CLASS):
+                    continue
+
+                span = cell.find('span')
+                cell_text = span.get_text(strip=True) if span else cell.get_text(strip=True)
+                cols.append(cell_text or "")
+
+            if cols:
+                table_data.append(cols)
+        return table_data
+
+    def iter_tables(self, html):
+        soup = BeautifulSoup(html, self.features)
+        for table in soup.find_all('table'):
+            if self.is_complex_table(table):
+                logger.info("Complex table.")
+                continue
+            yield HEADER_TABLE_CLASS in table.get('class', []), self._table_rows(table)
+
+
+class LxmlTableParser:
+    name = "lxml"
+    supports_streaming = True
+
+    def _has_class(self, element, class_name):
+        return class_name in (element.get('class') or '').split()
+
+    def _collect_text(self, element, parts):
+        if element.text and element.tag not in _SKIPPED_TEXT_TAGS:
+            parts.append(element.text)
+        for child in element:
+            if isinstance(child.tag, str):
+                self._collect_text(child, parts)
+            if child.tail:
+                parts.append(child.tail)
+
+    def _text(self, element):
+        parts = []
+        self._collect_text(element, parts)
+        return ''.join(part.strip() for part in parts)
+
+    def _parse_table(self, table):
+        # One walk over the cells both detects complex spans and extracts the row text.
+        table_data = []
+        for row in table.iter('tr'):
+            cols = []
+            for cell in row.iter('td', 'th'):
+                if _is_complex_span(cell.get('colspan')) or _is_complex_span(cell.get('rowspan')):
+                    return None
+                if any(self._has_class(div, FOOTNOTE_CLASS) for div in cell.iter('div')):
+                    continue
+
+                span = next(cell.iter('span'), None)
+                cols.append(self._text(span if span is not None else cell))
+
+            if cols:
+                table_data.append(cols)
+        return table_data
+
+    def _iter_table_tree(self, root):
+        for table in root.iter('table'):
+            table_data = self._parse_table(table)
+            if table_data is None:
+                logger.info("Complex table.")
+                continue
+            yield self._has_class(table, HEADER_TABLE_CLASS), table_data
+
+    def iter_tables(self, html):
+        if isinstance(html, str):
+            html = html.encode('utf-8')
+        root = etree.fromstring(html, etree.HTMLParser(encoding='utf-8'))
+        if root is None:
+            return
+        yield from self._iter_table_tree(root)
+
+    def iter_tables_from_file(self, path):
+        for _, table in etree.iterparse(path, events=('end',), tag='table', html=True, encoding='utf-8', huge_tree=True):
+            if next(table.iterancestors('table'), None) is not None:
+                continue
+
+            yield from self._iter_table_tree(table)
+
+            # Drop everything parsed so far: the table, its earlier siblings and, since KAP wraps
+            # tables in divs, the earlier siblings of every ancestor, so memory stays flat.
+            table.clear()
+            for element in itertools.chain((table,), table.iterancestors()):
+                while element.getprevious() is not None:
+                    del element.getparent()[0]
+
+
+def create_table_parser(backend):
+    if backend == "lxml":
+        if etree is not None:
+            return LxmlTableParser()
+        logger.warning("lxml is not installed, falling back to BeautifulSoup table parsing")
+    if backend == "bs4-lxml":
+        return BeautifulSoupTableParser(features='lxml')
+    return BeautifulSoupTableParser()
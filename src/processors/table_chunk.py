@@ -1,8 +1,7 @@
 import pandas as pd
-import os
-import glob
 import logging
-from ..services.chroma_table_service import ChromaTableService
+from ..services.chroma_table_service import ChromaTableService, build_table_metadata, excel_to_json
+from ..utils.table_frame import excel_round_trip
 
 logger = logging.getLogger(__name__)
 
@@ -10,37 +9,25 @@ class TableChunk:
     def __init__(self):
         self.chroma_service = ChromaTableService()
 
-    def process_table_chunks(self):
-        table_files = [f for f in glob.glob('notification_htmls/*_table_*.xlsx') if '_chunk_' not in f]
-            
-        for file_path in table_files:
-            self.process_table(file_path)
+    def chunk_table(self, df, notification_id, table_num, chunk_size=15):
+        return chunk_table(df, notification_id, table_num, chunk_size)
 
 
-    def process_table(self,file_path):
-        filename = os.path.basename(file_path)
-        parts = filename.split('_')
-        notification_id = parts[0]
-        table_num = parts[2].replace('.xlsx', '')  
-            
-        df = pd.read_excel(file_path)
-            
-        first_three_rows = df.iloc[:2]
-        remaining_rows = df.iloc[2:]
-            
-        chunk_size = 15
-        chunks = [remaining_rows[i:i+chunk_size] for i in range(0, len(remaining_rows), chunk_size)]
-            
-        for idx, chunk in enumerate(chunks):
-            combined_chunk = pd.concat([first_three_rows, chunk])
-            output_filename = f"notification_htmls/{notification_id}_table_{table_num}_chunk_{idx+1}.xlsx"
-            combined_chunk.to_excel(output_filename, index=False)
-                
-        print(f"Processed {filename} - created {len(chunks)} chunks")
-
-        if '_chunk_' not in filename:
-            os.remove(file_path)
-            print(f"Deleted original file: {filename}")
+def chunk_table(df, notification_id, table_num, chunk_size=15):
+    first_three_rows = df.iloc[:2]
+    remaining_rows = df.iloc[2:]
         
-        self.chroma_service.save_to_chroma_table()
-
+    chunks = [remaining_rows[i:i+chunk_size] for i in range(0, len(remaining_rows), chunk_size)]
+    documents = []
+        
+    for idx, chunk in enumerate(chunks):
+        combined_chunk = excel_round_trip(pd.concat([first_three_rows, chunk]))
+        table_id = f"{notification_id}_table_{table_num}_chunk_{idx+1}"
+        documents.append({
+            'id': table_id,
+            'document': excel_to_json(combined_chunk),
+            'metadata': build_table_metadata(notification_id, table_num, idx + 1, f"{table_id}.xlsx")
+        })
+            
+    print(f"Processed {notification_id}_table_{table_num} - created {len(chunks)} chunks")
+    return documents
@@ -0,0 +1,179 @@
+import logging
+import os
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from ..core.config import config
+from ..core.concurrency import create_process_pool
+from ..utils.table_frame import write_table_artifact
+from .table_chunk import chunk_table
+
+logger = logging.getLogger(__name__)
+
+
+class StageTimer:
+    def __init__(self):
+        self.seconds = defaultdict(float)
+        self.items = defaultdict(int)
+
+    @contextmanager
+    def measure(self, stage):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.seconds[stage] += time.perf_counter() - started
+
+    def count(self, stage, items=1):
+        self.items[stage] += items
+
+    def merge(self, report):
+        for stage, timing in (report or {}).items():
+            self.seconds[stage] += timing["seconds"]
+            self.items[stage] += timing["items"]
+
+    def report(self):
+        return {
+            stage: {
+                "seconds": round(self.seconds[stage], 3),
+                "items": self.items[stage]
+            }
+            for stage in self.seconds
+        }
+
+
+_worker_processor = None
+
+
+def _get_worker_processor():
+    # Pool workers and Celery subtasks only parse and chunk, so they skip the Chroma connection.
+    global _worker_processor
+    if _worker_processor is None:
+        from .excel_processor import ExcelProcessor
+        _worker_processor = ExcelProcessor(with_storage=False)
+    return _worker_processor
+
+
+def process_html_file(html_file, excel_processor=None):
+    excel_processor = excel_processor or _get_worker_processor()
+    notification_id = os.path.basename(html_file).replace('.html', '')
+    timer = StageTimer()
+    result = {
+        "html_file": html_file,
+        "notification_id": notification_id,
+        "documents": [],
+        "failed": False
+    }
+
+    logger.info(f"Processing notification: {notification_id}")
+    try:
+        with timer.measure("html"):
+            tables = excel_processor.extract_tables_from_file(html_file, notification_id)
+        timer.count("html")
+    except Exception as e:
+        logger.error(f"{html_file} processing error: {e}")
+        result["failed"] = True
+        tables = []
+
+    for table_num, df in tables:
+        write_table_artifact(df, f"{notification_id}_table_{table_num}")
+        try:
+            with timer.measure("chunk"):
+                result["documents"].extend(chunk_table(df, notification_id, table_num))
+            timer.count("chunk")
+        except Exception as e:
+            logger.error(f"{notification_id} table {table_num} chunking error: {e}")
+            result["failed"] = True
+
+    result["timings"] = timer.report()
+    return result
+
+
+class TablePipeline:
+    def __init__(self, excel_processor, workers=None):
+        self.excel_processor = excel_processor
+        self.chroma_service = excel_processor.table_chunk.chroma_service
+        if workers is None:
+            workers = 1 if config.TABLE_PIPELINE_MODE == "serial" else config.TABLE_PIPELINE_WORKERS
+        self.workers = workers
+        self.timer = StageTimer()
+
+    def _process_serial(self, html_files):
+        return [process_html_file(html_file, self.excel_processor) for html_file in html_files]
+
+    def _process_parallel(self, html_files):
+        results = []
+        with create_process_pool(self.workers) as executor:
+            futures = [executor.submit(process_html_file, html_file) for html_file in html_files]
+            for html_file, future in zip(html_files, futures):
+                try:
+                    results.append(future.result())
+                except Exception as e:
+                    logger.error(f"{html_file} worker error: {e}")
+                    results.append({
+                        "html_file": html_file,
+                        "notification_id": os.path.basename(html_file).replace('.html', ''),
+                        "documents": [],
+                        "failed": True,
+                        "timings": None
+                    })
+        return results
+
+    def _save_documents(self, documents):
+        with self.timer.measure("upsert"):
+            saved_ids = self.chroma_service.save_table_documents(documents, advance_cursor=False)
+        self.timer.count("upsert", len(saved_ids))
+        return saved_ids
+
+    def _is_saved(self, result, saved_ids):
+        return not result["failed"] and all(document['id'] in saved_ids for document in result["documents"])
+
+    def _set_aside_html(self, html_file):
+        # Skipped notifications are kept for inspection, outside the glob that feeds the next run.
+        if not os.path.exists(html_file):
+            return
+        skipped_dir = os.path.join(os.path.dirname(html_file), "skipped")
+        os.makedirs(skipped_dir, exist_ok=True)
+        os.replace(html_file, os.path.join(skipped_dir, os.path.basename(html_file)))
+        logger.warning(f"Moved skipped notification file {html_file} to {skipped_dir}")
+
+    def _cleanup_html(self, results, saved_ids):
+        skipped = self.chroma_service.skipped_notifications()
+        for result in results:
+            if int(result["notification_id"]) in skipped and not self._is_saved(result, saved_ids):
+                self._set_aside_html(result["html_file"])
+                continue
+            if result["failed"]:
+                continue
+            documents = result["documents"]
+            if documents and all(document['id'] in saved_ids for document in documents) and os.path.exists(result["html_file"]):
+                os.remove(result["html_file"])
+
+    def run(self, html_files):
+        if self.workers > 1 and len(html_files) > 1:
+            results = self._process_parallel(html_files)
+        else:
+            results = self._process_serial(html_files)
+        return self.finish(results)
+
+    def finish(self, results):
+        # Results arrive in html_files order, so documents are saved once every file has been
+        # processed and the cursor only moves past files that were saved completely.
+        documents = []
+        for result in results:
+            self.timer.merge(result["timings"])
+            documents.extend(result["documents"])
+
+        saved_ids = self._save_documents(documents) if documents else set()
+        self.chroma_service.advance_cursor(
+            (int(result["notification_id"]), self._is_saved(result, saved_ids)) for result in results
+        )
+        self._cleanup_html(results, saved_ids)
+
+        failed = [result["notification_id"] for result in results if result["failed"]]
+        if failed:
+            logger.warning(f"{len(failed)} HTML files failed and are kept for the next run: {failed}")
+
+        report = self.timer.report()
+        logger.info(f"Table pipeline finished: {len(results)} HTML files, {len(saved_ids)} chunks saved, timings: {report}")
+        return report
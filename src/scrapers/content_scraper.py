@@ -1,12 +1,13 @@
 import pandas as pd
 from bs4 import BeautifulSoup
-import requests
-import time
 import logging
 import json
+from contextlib import closing
 import os
 from ..core.config import config
 from ..processors.csv_processor import CSVProcessor
+from ..utils.notification_store import NotificationStore
+from .http_fetcher import HttpFetcher
 
 logger = logging.getLogger(__name__)
 
@@ -14,6 +15,9 @@ class ContentScraper:
     def __init__(self):
         self.csv_processor = CSVProcessor()
         self.last_processed_file = config.LAST_PROCESSED_PATH
+        self.fetcher = HttpFetcher(headers=self.get_headers())
+        self.store = NotificationStore()
+        self.failed_ids = []
     def process_content(self):
         url = self.process_content()
         logger.info("Starting content scraper")
@@ -50,7 +54,7 @@ class ContentScraper:
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
             'Accept-Language': 'tr,en-US;q=0.7,en;q=0.3',
             'Connection': 'keep-alive',
-            'Referer': 'https://www.kap.org.tr/tr/bildirim-sorgu-sonuc'
+            'Referer': f'{config.KAP_BASE_URL}/tr/bildirim-sorgu-sonuc'
         }
 
     def extract_history_info(self, soup):
@@ -92,11 +96,10 @@ class ContentScraper:
         return content_info
 
     def get_notification_content(self, notification_id):
-        url = f"https://www.kap.org.tr/tr/Bildirim/{notification_id}"
+        url = f"{config.KAP_BASE_URL}/tr/Bildirim/{notification_id}"
         
         try:
-            response = requests.get(url, headers=self.get_headers())
-            response.raise_for_status()
+            response = self.fetcher.get_cached(url)
             
             soup = BeautifulSoup(response.text, 'html.parser')
             
@@ -125,7 +128,7 @@ class ContentScraper:
             
         content = self.get_notification_content(notification_id)
         if not content:
-            return None
+            raise RuntimeError(f"Notification content could not be fetched (ID: {notification_id})")
                 
         result = {
             'id': notification_id,
@@ -137,11 +140,14 @@ class ContentScraper:
         }
         return result
 
-    def parse_notifications(self, html_content):
+    def iter_notifications(self, html_content):
         soup = BeautifulSoup(html_content, 'html.parser')
-        notifications = []
         last_processed = self.load_last_processed()
         last_id = last_processed.get('last_id', None)
+        stored_id = self.store.last_id()
+        if stored_id and (not last_id or stored_id > int(last_id)):
+            logger.info(f"Resuming after last stored notification: {stored_id}")
+            last_id = stored_id
         
         notification_rows = soup.find_all('tr', class_=lambda x: x and ('notification-row' in x or 'cursor-pointer' in x))
         logger.info(f"Total {len(notification_rows)} notifications found")
@@ -158,53 +164,76 @@ class ContentScraper:
         target_rows = notification_rows[:last_id_index] if last_id_index is not None else notification_rows
         logger.info(f"Processing {len(target_rows)} notifications")
         
-        for row in reversed(target_rows):
-            result = self.process_notification_row(row)
-            if result:
-                notifications.append(result)
-            time.sleep(0.5)
-        
-        return notifications
+        # The store resumes after its last id, so the run stops at the first failed notification
+        # instead of storing later ones past it.
+        self.failed_ids = []
+        rows = list(reversed(target_rows))
+        # Closing the downloads cancels the ones not started yet once the loop stops.
+        with closing(self.fetcher.imap(self.process_notification_row, rows, return_exceptions=True)) as results:
+            for row, result in zip(rows, results):
+                if isinstance(result, Exception):
+                    self.failed_ids.append(row.find('input', {'type': 'checkbox'})['id'])
+                    logger.error(f"Notification {self.failed_ids[0]} failed, later notifications are left for the next run")
+                    return
+                if result:
+                    yield result
 
-    def save_to_files(self, notifications):
-        if not notifications:
-            logger.info("No data to save")
-            return
-        
-        header_content_data = [{
-            'id': notification['id'],
+    def parse_notifications(self, html_content):
+        return list(self.iter_notifications(html_content))
+
+    def build_record(self, notification):
+        return {
+            'id': int(notification['id']),
             'title': notification['title'],
             'content': notification['content_info'],
             'history': pd.to_datetime(notification['history_info'], format='%d.%m.%Y').strftime('%Y-%m-%d'),
             'period': notification['period_info']
-        } for notification in notifications]
-        
-        header_content_df = pd.DataFrame(header_content_data)
-        header_content_df.to_csv('header_content.csv', index=False, encoding='utf-8-sig')
+        }
+
+    def save_to_files(self, notifications):
+        saved = 0
+        for notification in notifications:
+            self.store.append(self.build_record(notification))
+            saved += 1
 
-    def fetch_html_content(self, url):
+        if not saved:
+            logger.info("No data to save")
+        return saved
+
+    def fetch_listing(self):
+        # Shared with ExcelToHtml: within KAP_LISTING_MAX_AGE_SECONDS both scrapers reuse one download.
+        url = config.KAP_LISTING_URL
         logger.info(f"URL is being accessed: {url}")
-        response = requests.get(url, headers=self.get_headers())
-        response.raise_for_status()
-        return response.text
+        return self.fetcher.get_cached(url, max_age=config.KAP_LISTING_MAX_AGE_SECONDS)
+
+    def listing_consumed(self, page):
+        return self.fetcher.cache is not None and self.fetcher.cache.is_consumed(page.url, "content", page.digest)
 
     def process_content(self):
-        url = "https://www.kap.org.tr/tr/bildirim-sorgu-sonuc?srcbar=Y&cmp=Y&cat=4&s=4028328c594bfdca01594c0af9aa0057&st=Finansal%20Rapor&kw=bilan%C3%A7o&slf=FR"
-        
         logger.info("Starting content scraper")
         logger.info(f"Last processed file path: {self.last_processed_file}")
         
-        html_content = self.fetch_html_content(url)
+        page = self.fetch_listing()
+        html_content = page.text
         if not html_content:
             logger.error("Failed to fetch HTML content")
             return
             
-        logger.info("Successfully fetched HTML content")
-        notifications = self.parse_notifications(html_content)
-        
-        if notifications:
-            logger.info(f"Found {len(notifications)} new notifications")
-            self.save_to_files(notifications)
-            self.csv_processor.process_csv()
+        if self.listing_consumed(page):
+            logger.info("Listing unchanged since the last run, no new notifications")
         else:
-            logger.info("No new notifications found") 
\ No newline at end of file
+            logger.info("Successfully fetched HTML content")
+            saved = self.save_to_files(self.iter_notifications(html_content))
+            
+            if saved:
+                logger.info(f"Found {saved} new notifications")
+            else:
+                logger.info("No new notifications found")
+        self.csv_processor.process_csv()
+
+        if self.fetcher.cache is not None:
+            # An unchanged listing is skipped on the next run, so it only counts as consumed
+            # when every notification in it was fetched.
+            if not self.failed_ids:
+                self.fetcher.cache.mark_consumed(page.url, "content", page.digest)
+            self.fetcher.cache.prune() 
\ No newline at end of file
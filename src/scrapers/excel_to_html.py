@@ -1,14 +1,12 @@
 from bs4 import BeautifulSoup
-import requests
-import time
 import os
 import logging
 from ..core.config import config
 import json
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
+from contextlib import closing
 from ..core.client import ClientWrapper
 from ..processors.excel_processor import ExcelProcessor
+from .http_fetcher import HttpFetcher
 
 logging.basicConfig(
     level=logging.INFO,
@@ -20,6 +18,8 @@ class ExcelToHtml:
     def __init__(self):
         self.LAST_PROCESSED_TABLE = config.LAST_PROCESSED_TABLE_PATH
         self.excel_processor = ExcelProcessor()
+        self.fetcher = HttpFetcher(headers=self.get_headers())
+        self.failed_ids = []
     def load_last_processed_to_table(self):
         if not os.path.exists(self.LAST_PROCESSED_TABLE):
             return {}
@@ -27,40 +27,26 @@ class ExcelToHtml:
         with open(self.LAST_PROCESSED_TABLE, 'r') as f:
             return json.load(f)
 
-    def create_session(self):
-        session = requests.Session()
-        retries = Retry(
-            total=3,
-            backoff_factor=1,
-            status_forcelist=[500, 502, 503, 504],
-            raise_on_status=False
-        )
-        session.mount('https://', HTTPAdapter(max_retries=retries))
-        return session
-
     def get_headers(self):
         return {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
             'Accept-Language': 'tr,en-US;q=0.7,en;q=0.3',
             'Connection': 'keep-alive',
-            'Referer': 'https://www.kap.org.tr/tr/bildirim-sorgu-sonuc'
+            'Referer': f'{config.KAP_BASE_URL}/tr/bildirim-sorgu-sonuc'
         }
 
     def get_notification_content(self, notification_id):
-        url = f"https://www.kap.org.tr/en/api/notification/export/excel/{notification_id}"
+        url = f"{config.KAP_BASE_URL}/en/api/notification/export/excel/{notification_id}"
         
+        response = self.fetcher.get_cached(url)
+        return response.text
 
-        session = self.create_session()
-        response = session.get(url, headers=self.get_headers(), stream=True, timeout=30)
-        response.raise_for_status()
-
+    def save_html(self, notification_id, html_content):
         os.makedirs('notification_htmls', exist_ok=True)
         with open(f'notification_htmls/{notification_id}.html', 'w', encoding='utf-8') as f:
-            f.write(response.text)
+            f.write(html_content)
         logger.info(f"HTML content saved for notification {notification_id}")
-            
-        return response.text
 
     def process_notification_row(self, row):
         checkbox = row.find('input', {'type': 'checkbox'})
@@ -74,7 +60,6 @@ class ExcelToHtml:
         if not html_content:
             return None
                 
-        time.sleep(0.5)   
         result = {
             'id': notification_id,
             'html_content': html_content
@@ -104,19 +89,27 @@ class ExcelToHtml:
         target_rows = notification_rows[last_id_index + 1:] if last_id_index is not None else notification_rows
         logger.info(f"Processing {len(target_rows)} notifications")
         
-        for row in target_rows:
-            result = self.process_notification_row(row)
-            if result:
-                notifications.append(result)
-            time.sleep(0.5)
+        # Files are written in notification order and the run stops at the first failed download:
+        # the table cursor only moves past notifications that have a file, so a later file would
+        # let the failed one be skipped for good.
+        self.failed_ids = []
+        # Closing the downloads cancels the ones not started yet once the loop stops.
+        with closing(self.fetcher.imap(self.process_notification_row, target_rows, return_exceptions=True)) as results:
+            for row, result in zip(target_rows, results):
+                if isinstance(result, Exception):
+                    self.failed_ids.append(row.find('input', {'type': 'checkbox'})['id'])
+                    logger.error(f"Download of notification {self.failed_ids[0]} failed, later notifications are left for the next run")
+                    break
+                if result:
+                    self.save_html(result['id'], result['html_content'])
+                    notifications.append(result)
         
         return notifications
 
-    def fetch_html_content(self, url):
+    def fetch_listing(self):
+        url = config.KAP_LISTING_URL
         logger.info(f"URL is being accessed: {url}")
-        response = requests.get(url, headers=self.get_headers())
-        response.raise_for_status()
-        return response.text
+        return self.fetcher.get_cached(url, max_age=config.KAP_LISTING_MAX_AGE_SECONDS)
 
 
     def chroma_connection_error(self):
@@ -133,12 +126,16 @@ class ExcelToHtml:
             logger.error("Chrome connection error - skipping last_id update")
             return False
             
-        url = "https://www.kap.org.tr/en/bildirim-sorgu-sonuc?srcbar=Y&cmp=Y&cat=4&s=4028328c594bfdca01594c0af9aa0057&st=Finansal%20Rapor&kw=bilan%C3%A7o&slf=FR"
-        
-        html_content = self.fetch_html_content(url)
+        page = self.fetch_listing()
+        html_content = page.text
         if not html_content:
             logger.error("HTML is not fetched")
             return False
+
+        cache = self.fetcher.cache
+        if cache is not None and cache.is_consumed(page.url, "tables", page.digest):
+            logger.info("Listing unchanged since the last run, no new notifications")
+            return True
             
         notifications = self.parse_notifications(html_content)
         if notifications:
@@ -147,8 +144,12 @@ class ExcelToHtml:
             if result["status"] == "error":
                 logger.error(f"Error processing tables: {result['message']}")
                 return False
-            return True
         else:
             logger.info("No new notifications found")
-            return True
+
+        # An unchanged listing is skipped on the next run, so it only counts as consumed when
+        # every notification in it was downloaded.
+        if cache is not None and not self.failed_ids:
+            cache.mark_consumed(page.url, "tables", page.digest)
+        return True
 
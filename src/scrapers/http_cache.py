@@ -0,0 +1,120 @@
+import gzip
+import hashlib
+import json
+import logging
+import os
+import time
+from ..core.config import config
+
+logger = logging.getLogger(__name__)
+
+
+class CachedPage:
+    def __init__(self, url, content, encoding=None, digest=None, from_cache=False, not_modified=False):
+        self.url = url
+        self.content = content
+        self.encoding = encoding or 'utf-8'
+        self.digest = digest or hashlib.sha256(content).hexdigest()
+        self.from_cache = from_cache
+        self.not_modified = not_modified
+
+    @property
+    def text(self):
+        return self.content.decode(self.encoding, errors='replace')
+
+
+class HttpCache:
+    """On-disk cache of response bodies keyed by URL, with the validators needed for conditional requests."""
+
+    def __init__(self, directory=None, ttl_seconds=None):
+        self.directory = directory or config.HTTP_CACHE_DIR
+        self.ttl_seconds = config.HTTP_CACHE_TTL_SECONDS if ttl_seconds is None else ttl_seconds
+
+    def _paths(self, url):
+        key = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        base = os.path.join(self.directory, key[:2], key)
+        return f"{base}.json", f"{base}.gz"
+
+    def _write(self, path, data):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def load(self, url):
+        meta_path, _ = self._paths(url)
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable cache entry for {url}: {e}")
+            return None
+
+    def _save_meta(self, url, entry):
+        meta_path, _ = self._paths(url)
+        self._write(meta_path, json.dumps(entry).encode('utf-8'))
+
+    def page(self, url, entry, not_modified=False):
+        _, body_path = self._paths(url)
+        with open(body_path, 'rb') as f:
+            content = gzip.decompress(f.read())
+        return CachedPage(url, content, entry.get('encoding'), entry.get('digest'), from_cache=True, not_modified=not_modified)
+
+    def store(self, url, response):
+        content = response.content
+        _, body_path = self._paths(url)
+        self._write(body_path, gzip.compress(content))
+
+        previous = self.load(url) or {}
+        entry = {
+            'url': url,
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'encoding': response.encoding or response.apparent_encoding,
+            'digest': hashlib.sha256(content).hexdigest(),
+            'fetched_at': time.time(),
+            'consumed': previous.get('consumed', {})
+        }
+        self._save_meta(url, entry)
+        return CachedPage(url, content, entry['encoding'], entry['digest'])
+
+    def touch(self, url, entry):
+        entry['fetched_at'] = time.time()
+        self._save_meta(url, entry)
+
+    def is_consumed(self, url, consumer, digest):
+        entry = self.load(url) or {}
+        return entry.get('consumed', {}).get(consumer) == digest
+
+    def mark_consumed(self, url, consumer, digest):
+        entry = self.load(url)
+        if entry is None:
+            return
+        entry.setdefault('consumed', {})[consumer] = digest
+        self._save_meta(url, entry)
+
+    def prune(self):
+        if not self.ttl_seconds or not os.path.isdir(self.directory):
+            return 0
+
+        removed = 0
+        cutoff = time.time() - self.ttl_seconds
+        for root, _, files in os.walk(self.directory):
+            for file in files:
+                if not file.endswith('.json'):
+                    continue
+                meta_path = os.path.join(root, file)
+                if os.path.getmtime(meta_path) >= cutoff:
+                    continue
+                for path in (meta_path, meta_path[:-len('.json')] + '.gz'):
+                    try:
+                        os.remove(path)
+                    except FileNotFoundError:
+                        pass
+                removed += 1
+        if removed:
+            logger.info(f"Pruned {removed} expired HTTP cache entries")
+        return removed
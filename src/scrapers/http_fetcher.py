@@ -0,0 +1,162 @@
+import itertools
+import logging
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+import requests
+from requests.adapters import HTTPAdapter
+from ..core.config import config
+from ..core.rate_limiter import TokenBucketRateLimiter
+from .http_cache import CachedPage, HttpCache
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class HttpFetcher:
+    def __init__(self, headers=None, max_workers=None, requests_per_minute=None, burst=None,
+                 retries=None, backoff=None, timeout=None, cache=None):
+        self.headers = headers or {}
+        self.max_workers = max_workers or config.SCRAPER_CONCURRENCY
+        self.requests_per_minute = requests_per_minute or config.SCRAPER_REQUESTS_PER_MINUTE
+        self.burst = burst or config.SCRAPER_RATE_LIMIT_BURST
+        self.retries = config.SCRAPER_RETRIES if retries is None else retries
+        self.backoff = config.SCRAPER_RETRY_BACKOFF if backoff is None else backoff
+        self.timeout = timeout or config.SCRAPER_TIMEOUT
+
+        # One pooled session keeps connections alive across notifications and worker threads.
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=self.max_workers, pool_maxsize=self.max_workers)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self._limiters = {}
+        self._lock = threading.Lock()
+        self.cache = cache if cache is not None else (HttpCache() if config.HTTP_CACHE_ENABLED else None)
+        self._cache_stats = {"fresh": 0, "not_modified": 0, "fetched": 0}
+
+    def _limiter(self, url):
+        host = urlparse(url).netloc
+        with self._lock:
+            if host not in self._limiters:
+                self._limiters[host] = TokenBucketRateLimiter(self.requests_per_minute, burst=self.burst, name=f"http:{host}")
+            return self._limiters[host]
+
+    def _retry_delay(self, attempt, response=None):
+        retry_after = response.headers.get('Retry-After') if response is not None else None
+        if retry_after and retry_after.isdigit():
+            return float(retry_after)
+        return self.backoff * (2 ** attempt) * random.uniform(0.5, 1.5)
+
+    def get(self, url, **kwargs):
+        kwargs.setdefault('timeout', self.timeout)
+        headers = {**self.headers, **kwargs.pop('headers', {})}
+        limiter = self._limiter(url)
+
+        for attempt in range(self.retries + 1):
+            limiter.acquire()
+            try:
+                response = self.session.get(url, headers=headers, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt == self.retries:
+                    raise
+                delay = self._retry_delay(attempt)
+                logger.warning(f"Request to {url} failed ({e}), retrying in {delay:.2f}s")
+                time.sleep(delay)
+                continue
+
+            if response.status_code in RETRY_STATUSES and attempt < self.retries:
+                delay = self._retry_delay(attempt, response)
+                logger.warning(f"Request to {url} returned {response.status_code}, retrying in {delay:.2f}s")
+                time.sleep(delay)
+                continue
+
+            response.raise_for_status()
+            return response
+
+    def _count(self, outcome):
+        with self._lock:
+            self._cache_stats[outcome] += 1
+
+    def get_cached(self, url, max_age=0):
+        # Serves a cached body while it is younger than max_age, otherwise revalidates with
+        # If-None-Match/If-Modified-Since so an unchanged page costs a 304 instead of a full transfer.
+        if self.cache is None:
+            response = self.get(url)
+            self._count("fetched")
+            return CachedPage(url, response.content, response.encoding)
+
+        entry = self.cache.load(url)
+        if entry and max_age and time.time() - entry['fetched_at'] < max_age:
+            try:
+                page = self.cache.page(url, entry)
+                self._count("fresh")
+                return page
+            except OSError as e:
+                logger.warning(f"Cached body for {url} is unreadable, fetching again: {e}")
+                entry = None
+
+        headers = {}
+        if entry and entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry and entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+
+        response = self.get(url, headers=headers)
+        if response.status_code == 304 and entry:
+            try:
+                page = self.cache.page(url, entry, not_modified=True)
+                self.cache.touch(url, entry)
+                self._count("not_modified")
+                return page
+            except OSError as e:
+                logger.warning(f"Cached body for {url} is unreadable, fetching again: {e}")
+                response = self.get(url)
+
+        self._count("fetched")
+        return self.cache.store(url, response)
+
+    def imap(self, func, items, return_exceptions=False):
+        # Yields results in the order of items as they become available; an item whose func raises
+        # yields None, or the exception itself when return_exceptions is set. Items are submitted
+        # lazily, at most two per worker ahead of the consumer, and closing the generator cancels
+        # the ones not started yet, so a caller that stops early does not fetch the rest.
+        def run(item):
+            try:
+                return func(item)
+            except Exception as e:
+                logger.error(f"Fetch task failed for {item}: {e}")
+                return e if return_exceptions else None
+
+        items = list(items)
+        if self.max_workers <= 1 or len(items) < 2:
+            for item in items:
+                yield run(item)
+            return
+
+        remaining = iter(items)
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        try:
+            pending = deque(executor.submit(run, item) for item in itertools.islice(remaining, 2 * self.max_workers))
+            while pending:
+                result = pending.popleft().result()
+                pending.extend(executor.submit(run, item) for item in itertools.islice(remaining, 1))
+                yield result
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def map(self, func, items, return_exceptions=False):
+        return list(self.imap(func, items, return_exceptions))
+
+    def stats(self):
+        with self._lock:
+            return {
+                "hosts": {host: limiter.stats() for host, limiter in self._limiters.items()},
+                "cache": dict(self._cache_stats)
+            }
+
+    def close(self):
+        self.session.close()
@@ -3,10 +3,14 @@ import logging
 from ..core.config import config
 from .chroma_content_service import ChromaContentService
 from .chroma_table_service import ChromaTableService
-from chromadb.utils.embedding_functions import SentenceTransformerEmbeddingFunction
 from ..core.client import ClientWrapper
-from deep_translator import GoogleTranslator
-import time
+from ..core.embedding_engine import get_query_embedding_function
+from ..core.concurrency import stage_limiter
+from ..core.rate_limiter import llm_rate_limiter
+from .notification_index import get_notification_index
+from .query_cache import QueryAnalysisCache
+from .query_coalescer import QueryCoalescer
+from .translation_service import get_translation_service
 import json
 from ..core.prompts import prompt as prompt_template
 
@@ -19,10 +23,18 @@ table = ChromaTableService()
 class KAPChatbot:
     def __init__(self):
         genai.configure(api_key=config.GOOGLE_API_KEY)
-        self.model = genai.GenerativeModel('gemini-pro')
-        self.embedding_function = SentenceTransformerEmbeddingFunction(model_name="all-MiniLM-L6-v2")
+        self.model = genai.GenerativeModel(config.LLM_MODEL_NAME)
+        self.embedding_function = get_query_embedding_function()
         self.content_collection = self._setup_content_collection()
         self.table_collection = self._setup_table_collection()
+        self.translator = get_translation_service()
+        self.analysis_cache = QueryAnalysisCache(self.embedding_function) if config.ANALYSIS_CACHE_ENABLED else None
+        self.notification_index = self._setup_notification_index()
+        self.query_coalescer = QueryCoalescer(
+            self._run_query,
+            window_ms=config.CHROMA_QUERY_COALESCE_WINDOW_MS,
+            max_batch_size=config.CHROMA_QUERY_COALESCE_MAX_BATCH
+        ) if config.CHROMA_QUERY_COALESCE_ENABLED else None
 
     def _setup_content_collection(self):
         client = ClientWrapper().client
@@ -42,20 +54,42 @@ class KAPChatbot:
         )
         return collection
 
+    def _setup_notification_index(self):
+        index = get_notification_index()
+        if index is not None and not index.backfilled:
+            index.backfill(self.content_collection)
+        return index
+
+    def _run_query(self, collection, **kwargs):
+        with stage_limiter.slot("chroma"):
+            return collection.query(**kwargs)
+
+    def _query(self, collection, query_texts, n_results, where=None):
+        if self.query_coalescer is not None and len(query_texts) == 1:
+            return self.query_coalescer.query(collection, query_texts[0], n_results=n_results, where=where)
+        return self._run_query(collection, query_texts=query_texts, n_results=n_results, where=where)
+
+    def _get_metadatas(self, collection, *clauses):
+        where = clauses[0] if len(clauses) == 1 else {"$and": list(clauses)}
+        with stage_limiter.slot("chroma"):
+            return collection.get(where=where, include=["metadatas"])['metadatas']
+
+    def warmup(self, texts):
+        if texts:
+            self.embedding_function.precompute(texts)
+            logger.info(f"Embedding model warmed up; {len(texts)} query embeddings precomputed")
+
     def translate_to_english(self, text):
         if isinstance(text, dict):
             text = json.dumps(text, ensure_ascii=False)
             
         if not text or not text.strip():
             return text
-        try:
-            translator = GoogleTranslator(source='tr', target='en')
-            return translator.translate(text)
-        except Exception:
-            return text
+        return self.translator.translate(text)
         
     def company_search(self, company):
-        company_results = self.content_collection.query(
+        company_results = self._query(
+            self.content_collection,
             query_texts=[company],
             n_results=5,
             where={"is_title": True}
@@ -92,18 +126,18 @@ class KAPChatbot:
         return filtered_companies, filtered_ids
 
     def _get_titles_for_notifications(self, notification_ids, query_results):
-        content_results = self.content_collection.query(
-            query_texts=[""],
-            n_results=len(notification_ids),
-            where={"notification_id": {"$in": notification_ids}}
+        notification_ids = [notification_id for notification_id in dict.fromkeys(notification_ids) if notification_id is not None]
+        if not notification_ids:
+            return query_results
+
+        title_metadatas = self._get_metadatas(
+            self.content_collection,
+            {"notification_id": {"$in": notification_ids}},
+            {"is_title": True}
         )
-            
-        title_map = {}
-        for meta in content_results['metadatas'][0]:
-            if meta.get('is_title', False):
-                title_map[meta.get('notification_id')] = meta.get('title')
-            
-        for i, meta in enumerate(query_results['metadatas'][0]):
+        title_map = {meta.get('notification_id'): meta.get('title') for meta in title_metadatas}
+
+        for meta in query_results['metadatas'][0]:
             notif_id = meta.get('notification_id')
             if notif_id in title_map:
                 meta['title'] = title_map[notif_id]
@@ -112,7 +146,8 @@ class KAPChatbot:
 
     def _get_table_results(self, english_query, notification_ids, n_results):
         where_clause = {"notification_id": {"$in": notification_ids}} if notification_ids else {}
-        return self.table_collection.query(
+        return self._query(
+            self.table_collection,
             query_texts=[english_query],
             n_results=n_results,
             where=where_clause
@@ -120,63 +155,33 @@ class KAPChatbot:
 
     def _get_content_results(self, english_query, notification_ids, n_results):
         where_clause = {"notification_id": {"$in": notification_ids}} if notification_ids else {}
-        return self.content_collection.query(
+        return self._query(
+            self.content_collection,
             query_texts=[english_query],
             n_results=n_results,
             where=where_clause
         )
 
 
-    def _date_range(self, start_date, end_date, notification_ids):
-        where_clause = {"notification_id": {"$in": notification_ids}} if notification_ids else {}
-        results = self.content_collection.query(
-            query_texts=[""],
-            n_results=len(notification_ids),
-            where=where_clause
-        )
-        
-        filtered_results = {
-            'documents': [],
-            'metadatas': [],
-            'distances': []
-        }
-        
-        for i, metadata in enumerate(results['metadatas'][0]):
-            history_date = metadata.get('history')
-            if history_date and start_date <= history_date <= end_date:
-                filtered_results['documents'].append(results['documents'][0][i])
-                filtered_results['metadatas'].append(metadata)
-                filtered_results['distances'].append(results['distances'][0][i])
-        
-        return filtered_results
-
-    def _period_range(self, period, notification_ids):
-        where_clause = {"notification_id": {"$in": notification_ids}} if notification_ids else {}
-        results = self.content_collection.query(
-            query_texts=[""],
-            n_results=len(notification_ids),
-            where=where_clause
-        )
-        
-        if not results or not results.get('metadatas'):
-            return None
-            
-        filtered_results = {
-            'documents': [],
-            'metadatas': [],
-            'distances': []
-        }
-        
-        for i, metadata in enumerate(results['metadatas'][0]):
-            if metadata.get('period') == period:
-                filtered_results['documents'].append(results['documents'][0][i])
-                filtered_results['metadatas'].append(metadata)
-                filtered_results['distances'].append(results['distances'][0][i])
-        
-        return filtered_results
-
-    def search_disclosures(self, response, company=None, n_results=5, distance_threshold=0.86, query_type=None, start_date=None, end_date=None, period=None):
-        query_analysis = self.analyze_query(response)
+    def _filter_notifications(self, notification_ids, start_date=None, end_date=None, period=None):
+        # Title documents carry the notification's history and period, one per notification.
+        # history is a date string and Chroma only compares numbers, so the range is applied here.
+        clauses = [{"notification_id": {"$in": notification_ids}}, {"is_title": True}]
+        if period:
+            clauses.append({"period": period})
+        metadatas = self._get_metadatas(self.content_collection, *clauses)
+
+        if start_date and end_date:
+            metadatas = [
+                meta for meta in metadatas
+                if meta.get('history') and start_date <= meta['history'] <= end_date
+            ]
+        matched = {meta.get('notification_id') for meta in metadatas}
+        return [notification_id for notification_id in notification_ids if notification_id in matched]
+
+    def search_disclosures(self, response, company=None, n_results=5, distance_threshold=0.86, query_type=None, start_date=None, end_date=None, period=None, query_analysis=None):
+        if query_analysis is None:
+            query_analysis = self.analyze_query(response)
         english_query = self.translate_to_english(query_analysis)
 
         if query_type is None:
@@ -188,8 +193,24 @@ class KAPChatbot:
         query_results = None
         notification_ids = None
 
-        if company:
-            company_results = self.content_collection.query(
+        indexed_ids = None
+        if company and self.notification_index is not None:
+            indexed_ids = self.notification_index.resolve(company, start_date, end_date, period)
+            if indexed_ids is not None:
+                logger.info(f"Notification index resolved '{company}' to notification_ids: {indexed_ids}")
+                if not indexed_ids:
+                    logger.warning(f"No notifications of '{company}' match date range {start_date} - {end_date} and period {period}")
+                    return {
+                        'documents': [],
+                        'metadatas': [],
+                        'distances': [],
+                        'total_results': 0
+                    }
+                notification_ids = indexed_ids
+
+        if company and indexed_ids is None:
+            company_results = self._query(
+                self.content_collection,
                 query_texts=[company],
                 n_results=5,
                 where={"is_title": True}
@@ -207,27 +228,12 @@ class KAPChatbot:
                     'total_results': 0
                 }
 
-        if start_date and end_date and notification_ids:
-            date_filtered = self._date_range(start_date, end_date, notification_ids)
-            if date_filtered and date_filtered.get('metadatas') and len(date_filtered['metadatas']) > 0:
-                notification_ids = [meta.get('notification_id') for meta in date_filtered['metadatas']]
-                logger.info(f"Date filtering found notification_ids: {notification_ids}")
-            else:
-                logger.warning("No results found for the specified date range")
-                return {
-                    'documents': [],
-                    'metadatas': [],
-                    'distances': [],
-                    'total_results': 0
-                }
-
-        if period and notification_ids:
-            period_filtered = self._period_range(period, notification_ids)
-            if period_filtered and period_filtered.get('metadatas') and len(period_filtered['metadatas']) > 0:
-                notification_ids = [meta.get('notification_id') for meta in period_filtered['metadatas']]
-                logger.info(f"Period filtering found notification_ids: {notification_ids}")
+        if indexed_ids is None and notification_ids and ((start_date and end_date) or period):
+            notification_ids = self._filter_notifications(notification_ids, start_date, end_date, period)
+            if notification_ids:
+                logger.info(f"Date/period filtering found notification_ids: {notification_ids}")
             else:
-                logger.warning("No results found for the specified period")
+                logger.warning(f"No results found for date range {start_date} - {end_date} and period {period}")
                 return {
                     'documents': [],
                     'metadatas': [],
@@ -235,7 +241,6 @@ class KAPChatbot:
                     'total_results': 0
                 }
 
-
         if notification_ids:
             logger.info(f"Final notification_ids before query: {notification_ids}")
             if is_financial:
@@ -250,7 +255,7 @@ class KAPChatbot:
                 query_results = self._get_table_results(english_query, None, n_results)
                 if query_results and query_results.get('metadatas') and len(query_results['metadatas']) > 0:
                     query_results = self._get_titles_for_notifications(
-                        [meta.get('notification_id') for meta in query_results['metadatas']],
+                        [meta.get('notification_id') for meta in query_results['metadatas'][0]],
                         query_results
                     )
             elif is_general:
@@ -393,7 +398,7 @@ class KAPChatbot:
             query_analysis = self.analyze_query(search_query)
             print(f"\nQuery Analysis: {query_analysis}")
             
-            results = self.search_disclosures(search_query, company, n_results=5, query_type=query_type)
+            results = self.search_disclosures(search_query, company, n_results=5, query_type=query_type, query_analysis=query_analysis)
             response = self.format_response(results, search_query, limit=3)
             gemini_prompt = f"""
                 Query: {search_query}
@@ -411,8 +416,26 @@ class KAPChatbot:
             import traceback
             traceback.print_exc()
 
-    def analyze_query(self, response):
-        response = self.generate_response(response)
+    def build_query_analysis(self, question, query_type, company=None, keywords=None):
+        return {
+            "query_type": query_type or 'general KAP statement',
+            "args": {
+                "query": question,
+                "company": company,
+                "keywords": keywords or [],
+                "required_operations": []
+            },
+            "keywords": keywords or [],
+            "required_operations": []
+        }
+
+    def analyze_query(self, question):
+        if self.analysis_cache is None:
+            return self._analyze_query(question)
+        return self.analysis_cache.get_or_compute(question, self._analyze_query)
+
+    def _analyze_query(self, question):
+        response = self.generate_response(prompt_template.format(query=question))
         response = self.clean_json(response)
             
         try:
@@ -421,14 +444,19 @@ class KAPChatbot:
             start_idx = response.find('{')
             end_idx = response.rfind('}')
                 
-            if start_idx != -1 and end_idx != -1:
-                json_str = response[start_idx:end_idx+1]
-                try:
-                    analysis = json.loads(json_str)
-                except json.JSONDecodeError:
-                    logger.error(f"Could not parse JSON from extracted string: {json_str}")
-                    raise ValueError("Invalid JSON format in extracted string")
+            if start_idx == -1 or end_idx == -1:
+                logger.error(f"No JSON object in query analysis response: {response}")
+                raise ValueError("Query analysis response does not contain JSON")
+
+            json_str = response[start_idx:end_idx+1]
+            try:
+                analysis = json.loads(json_str)
+            except json.JSONDecodeError:
+                logger.error(f"Could not parse JSON from extracted string: {json_str}")
+                raise ValueError("Invalid JSON format in extracted string")
             
+        analysis['args'] = analysis.get('args') or {}
+        analysis['args']['query'] = analysis['args'].get('query') or question
         analysis['keywords'] = analysis.get('keywords', [])
         analysis['required_operations'] = analysis.get('required_operations', [])
         analysis['query_type'] = analysis.get('query_type', 'general KAP statement')
@@ -438,8 +466,7 @@ class KAPChatbot:
             
 
     def generate_response(self, prompt):
-        model = genai.GenerativeModel('gemini-2.0-flash')
-        time.sleep(2.5)
-        formatted_prompt = prompt_template.format(query=prompt)     
-        response = model.generate_content(formatted_prompt)
+        llm_rate_limiter.acquire()
+        with stage_limiter.slot("llm"):
+            response = self.model.generate_content(prompt)
         return response.text
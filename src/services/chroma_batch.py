@@ -0,0 +1,118 @@
+import logging
+import time
+from ..core.config import config
+from .embedding_index import get_dedup_index
+
+logger = logging.getLogger(__name__)
+
+
+def embed_documents(embedding_function, documents, batch_size=None):
+    batch_size = batch_size or config.CHROMA_EMBED_BATCH_SIZE
+    embeddings = []
+    for start in range(0, len(documents), batch_size):
+        embeddings.extend(embedding_function(documents[start:start + batch_size]))
+    return embeddings
+
+
+def embed_documents_deduplicated(embedding_function, documents, dedup_index, batch_size=None, stats=None):
+    # Each distinct normalized text is embedded at most once; vectors already in the index are reused.
+    keys = [dedup_index.key(document) for document in documents]
+    try:
+        vectors = dedup_index.get_many(list(set(keys)))
+    except Exception as e:
+        logger.warning(f"Embedding dedup lookup failed: {e}")
+        vectors = {}
+    reused = sum(1 for key in keys if key in vectors)
+
+    missing = {}
+    for key, document in zip(keys, documents):
+        if key not in vectors and key not in missing:
+            missing[key] = document
+    if missing:
+        computed = embed_documents(embedding_function, list(missing.values()), batch_size)
+        new_vectors = dict(zip(missing.keys(), computed))
+        try:
+            dedup_index.set_many(new_vectors)
+        except Exception as e:
+            logger.warning(f"Embedding dedup write failed: {e}")
+        vectors.update(new_vectors)
+
+    if stats is not None:
+        stats["embedded"] += len(missing)
+        stats["reused"] += reused
+    return [vectors[key] for key in keys]
+
+
+def _upsert_or_split(collection, ids, documents, metadatas, embeddings):
+    try:
+        collection.upsert(ids=ids, documents=documents, metadatas=metadatas, embeddings=embeddings)
+        return []
+    except Exception as e:
+        if len(ids) == 1:
+            logger.error(f"Failed to upsert document {ids[0]}: {e}")
+            return list(ids)
+
+    middle = len(ids) // 2
+    return (
+        _upsert_or_split(collection, ids[:middle], documents[:middle], metadatas[:middle], embeddings[:middle]) +
+        _upsert_or_split(collection, ids[middle:], documents[middle:], metadatas[middle:], embeddings[middle:])
+    )
+
+
+def _upsert_with_retry(collection, ids, documents, metadatas, embeddings, max_retries, backoff):
+    for attempt in range(max_retries + 1):
+        try:
+            collection.upsert(ids=ids, documents=documents, metadatas=metadatas, embeddings=embeddings)
+            return []
+        except Exception as e:
+            if attempt == max_retries:
+                logger.warning(f"Upsert of {len(ids)} documents failed after {attempt + 1} attempts, splitting batch: {e}")
+                break
+            delay = backoff * (2 ** attempt)
+            logger.warning(f"Upsert of {len(ids)} documents failed, retrying in {delay:.1f}s: {e}")
+            time.sleep(delay)
+
+    if len(ids) == 1:
+        return list(ids)
+    return _upsert_or_split(collection, ids, documents, metadatas, embeddings)
+
+
+def upsert_in_batches(collection, ids, documents, metadatas, embedding_function, embed_batch_size=None, upsert_batch_size=None, max_retries=None, dedup_index=None):
+    upsert_batch_size = upsert_batch_size or config.CHROMA_UPSERT_BATCH_SIZE
+    max_retries = config.CHROMA_UPSERT_RETRIES if max_retries is None else max_retries
+    backoff = config.CHROMA_UPSERT_RETRY_BACKOFF
+    dedup_index = dedup_index or get_dedup_index()
+
+    started = time.perf_counter()
+    failed_ids = []
+    dedup_stats = {"embedded": 0, "reused": 0}
+    for start in range(0, len(ids), upsert_batch_size):
+        end = start + upsert_batch_size
+        batch_documents = documents[start:end]
+        if dedup_index is not None:
+            embeddings = embed_documents_deduplicated(embedding_function, batch_documents, dedup_index, embed_batch_size, dedup_stats)
+        else:
+            embeddings = embed_documents(embedding_function, batch_documents, embed_batch_size)
+            dedup_stats["embedded"] += len(batch_documents)
+        failed_ids.extend(_upsert_with_retry(
+            collection, ids[start:end], batch_documents, metadatas[start:end], embeddings, max_retries, backoff
+        ))
+        logger.debug(f"Upserted documents {start}-{min(end, len(ids))} of {len(ids)}")
+
+    elapsed = time.perf_counter() - started
+    upserted = len(ids) - len(failed_ids)
+    rate = upserted / elapsed if elapsed > 0 else 0.0
+    dedup_ratio = 1 - dedup_stats["embedded"] / len(ids) if ids else 0.0
+    logger.info(
+        f"Upserted {upserted}/{len(ids)} documents into '{collection.name}' in {elapsed:.2f}s ({rate:.1f} docs/sec), "
+        f"embedded {dedup_stats['embedded']}, reused {dedup_stats['reused']} stored vectors, dedup ratio {dedup_ratio:.1%}"
+    )
+    return {
+        "documents": upserted,
+        "failed_ids": failed_ids,
+        "seconds": elapsed,
+        "docs_per_second": rate,
+        "embedded": dedup_stats["embedded"],
+        "reused": dedup_stats["reused"],
+        "dedup_ratio": dedup_ratio
+    }
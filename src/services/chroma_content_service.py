@@ -2,6 +2,8 @@ import pandas as pd
 import logging
 from ..core.client import ClientWrapper
 from ..core.config import config
+from .chroma_batch import upsert_in_batches
+from .notification_index import get_notification_index
 import os
 import json
 
@@ -53,30 +55,27 @@ class ChromaContentService:
         logger.info(f"Read {len(df)} records from CSV")
         return df
 
-    def _create_metadata(self, row):
-        return {
-            'title': str(row['title']) if pd.notna(row['title']) else '',
-            'content': str(row['content']) if pd.notna(row['content']) else '',
-            'is_title': bool(row['is_title']),
-            'notification_id': int(row['notification_id']),
-            'history': str(row['history']) if pd.notna(row['history']) else '',
-            'period': str(row['period']) if pd.notna(row['period']) else '',
-            'chunk_index': int(row['chunk_index']),
-            'total_chunks': int(row['total_chunks'])
-        }
-
-    def _process_document(self, row, collection):
-        doc_id = f"{row['notification_id']}_{row['chunk_index']}"
-        document_text = row['title'] if row['is_title'] else row['content']
-        metadata = self._create_metadata(row)
-        
-        collection.add(
-            documents=[document_text],
-            metadatas=[metadata],
-            ids=[doc_id]
-        )
-        logger.info(f"Added document {doc_id} to ChromaDB")
-        return True
+    def _text_column(self, df, column):
+        return df[column].where(df[column].notna(), '').astype(str)
+
+    def _build_documents(self, df):
+        is_title = df['is_title'].astype(bool)
+        titles = self._text_column(df, 'title')
+        contents = self._text_column(df, 'content')
+
+        ids = (df['notification_id'].astype(str) + '_' + df['chunk_index'].astype(str)).tolist()
+        documents = titles.where(is_title, contents).tolist()
+        metadatas = pd.DataFrame({
+            'title': titles,
+            'content': contents,
+            'is_title': is_title,
+            'notification_id': df['notification_id'].astype(int),
+            'history': self._text_column(df, 'history'),
+            'period': self._text_column(df, 'period'),
+            'chunk_index': df['chunk_index'].astype(int),
+            'total_chunks': df['total_chunks'].astype(int)
+        }).to_dict(orient='records')
+        return ids, documents, metadatas
 
 
     def _cleanup_csv_file(self, csv_file):
@@ -92,18 +91,22 @@ class ChromaContentService:
                 return
 
             collection = self.setup_chroma_content()
-            processed_count = 0
-            last_notification_id = None
-            
-            for _, row in df.iterrows():
-                if self._process_document(row, collection):
-                    processed_count += 1
-                    last_notification_id = row['notification_id']
-            
+            df = df.drop_duplicates(subset=['notification_id', 'chunk_index'], keep='first')
+            ids, documents, metadatas = self._build_documents(df)
+            result = upsert_in_batches(collection, ids, documents, metadatas, self.client.embedding_function)
+
+            if result['failed_ids']:
+                raise Exception(f"{len(result['failed_ids'])} documents could not be saved: {result['failed_ids'][:10]}")
+
+            notification_index = get_notification_index()
+            if notification_index is not None:
+                notification_index.add_many(meta for meta in metadatas if meta['is_title'])
+
+            last_notification_id = df['notification_id'].iloc[-1] if not df.empty else None
             if last_notification_id:
                 self.save_last_processed_to_content(last_notification_id)
                 
-            logger.info(f"Successfully processed {processed_count} out of {len(df)} documents")
+            logger.info(f"Successfully processed {result['documents']} out of {len(df)} documents ({result['docs_per_second']:.1f} docs/sec)")
             self._cleanup_csv_file(csv_file)
             
         except Exception as e:
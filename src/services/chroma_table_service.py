@@ -3,6 +3,8 @@ import logging
 import os
 from ..core.client import ClientWrapper
 from ..core.config import config
+from ..core.concurrency import create_process_pool
+from .chroma_batch import upsert_in_batches
 import re
 import json
 import subprocess
@@ -34,12 +36,26 @@ class ChromaTableService:
             logger.error(f"Chroma connection error: {e}")
             raise
         
-    def save_last_processed_to_table(self, notification_id):
+    def load_table_cursor(self):
+        if not os.path.exists(self.LAST_PROCESSED_TABLE):
+            return {}
+        with open(self.LAST_PROCESSED_TABLE, 'r') as f:
+            return json.load(f)
+
+    def save_table_cursor(self, cursor):
         os.makedirs(os.path.dirname(self.LAST_PROCESSED_TABLE), exist_ok=True)
         with open(self.LAST_PROCESSED_TABLE, 'w') as f:
-            json.dump({'last_id': notification_id}, f)
+            json.dump(cursor, f)
+
+    def save_last_processed_to_table(self, notification_id):
+        cursor = self.load_table_cursor()
+        cursor['last_id'] = notification_id
+        self.save_table_cursor(cursor)
         logger.info(f"Successfully saved last processed ID: {notification_id}")
 
+    def skipped_notifications(self):
+        return {int(notification_id) for notification_id in self.load_table_cursor().get('skipped', [])}
+
     def _get_excel_files(self):
         excel_files = []
         for root, _, files in os.walk('notification_htmls'):
@@ -52,37 +68,29 @@ class ChromaTableService:
         logger.info(f"Found {len(excel_files)} valid Excel files")
         return excel_files
 
-    def _process_excel_file(self, file_path, collection):
-        filename = os.path.basename(file_path)
-        info = extract_info_from_filename(filename)
-        
-        if not info:
-            logger.warning(f"Could not extract info from filename: {filename}")
-            return False
-            
-        try:
-            df = pd.read_excel(file_path)
-            content = excel_to_json(df)
-            
-            table_id = filename.replace('.xlsx', '').replace('.xls', '')
-            
-            collection.add(
-                documents=[content],
-                metadatas=[{
-                    'notification_id': int(info['notification_id']),
-                    'table_num': int(info['table_num']),
-                    'chunk_index': int(info['chunk_index']),
-                    'filename': str(filename),
-                    'content_type': 'excel_json'
-                }],
-                ids=[table_id]
-            )
-            logger.info(f"Added Excel file {filename} to ChromaDB")
-            return True
-            
-        except Exception as e:
-            logger.error(f"Error processing file {filename}: {e}")
-            return False
+    def _load_documents(self, excel_files):
+        workers = config.TABLE_INGEST_WORKERS
+        if workers <= 1 or len(excel_files) < 2 * workers:
+            results = []
+            for file_path in excel_files:
+                try:
+                    results.append(load_excel_document(file_path))
+                except Exception as e:
+                    logger.error(f"Error processing file {os.path.basename(file_path)}: {e}")
+            return [document for document in results if document]
+
+        documents = []
+        with create_process_pool(workers) as executor:
+            futures = [executor.submit(load_excel_document, file_path) for file_path in excel_files]
+            for file_path, future in zip(excel_files, futures):
+                try:
+                    document = future.result()
+                except Exception as e:
+                    logger.error(f"Error processing file {os.path.basename(file_path)}: {e}")
+                    continue
+                if document:
+                    documents.append(document)
+        return documents
 
     def _cleanup_processed_files(self, processed_files):
         for file_path in processed_files:
@@ -93,32 +101,92 @@ class ChromaTableService:
                 logger.error(f"Error deleting Excel file {file_path}: {e}")
 
     def save_to_chroma_table(self):
+        return self.save_table_files(self._get_excel_files())
+
+    def save_table_files(self, excel_files):
+        documents = self._load_documents(excel_files)
+        saved_ids = self.save_table_documents(documents, advance_cursor=False)
+        processed_files = [document['file_path'] for document in documents if document['id'] in saved_ids]
+        logger.info(f"Saved {len(processed_files)} of {len(excel_files)} Excel files to ChromaDB")
+
+        processed = set(processed_files)
+        self.advance_cursor(
+            (extract_info_from_filename(os.path.basename(file_path))['notification_id'], file_path in processed)
+            for file_path in excel_files
+        )
+        self._cleanup_processed_files(processed_files)
+        return processed_files
+
+    def advance_cursor(self, outcomes):
+        # A notification that fails TABLE_MAX_FAILURES runs in a row is recorded as skipped, so
+        # it stops holding the cursor back and later notifications are not re-downloaded forever.
+        outcomes = [(int(notification_id), saved) for notification_id, saved in outcomes]
+        cursor = self.load_table_cursor()
+        failures = cursor.get('failures', {})
+        skipped = set(cursor.get('skipped', []))
+        for notification_id in {notification_id for notification_id, saved in outcomes if not saved}:
+            if notification_id in skipped:
+                continue
+            failures[str(notification_id)] = failures.get(str(notification_id), 0) + 1
+            if failures[str(notification_id)] >= config.TABLE_MAX_FAILURES:
+                logger.error(f"Notification {notification_id} failed {failures[str(notification_id)]} times, skipping it")
+                del failures[str(notification_id)]
+                skipped.add(notification_id)
+        saved_notifications = {notification_id for notification_id, saved in outcomes if saved}
+        failures = {key: count for key, count in failures.items() if int(key) not in saved_notifications}
+
+        notification_id = contiguous_cursor(outcomes, skipped)
+        if notification_id:
+            cursor['last_id'] = notification_id
+            logger.info(f"Successfully saved last processed ID: {notification_id}")
+        cursor['failures'] = failures
+        cursor['skipped'] = sorted(skipped)
+        self.save_table_cursor(cursor)
+        return notification_id
+
+    def save_table_documents(self, documents, advance_cursor=True):
         try:
+            if not documents:
+                logger.info("No table documents to save")
+                return set()
+
             collection = self.setup_chroma_table()
-            excel_files = self._get_excel_files()
-            processed_files = []
-            
-            
-            current_notification_id = None
-            for file_path in excel_files:
-                if self._process_excel_file(file_path, collection):
-                    processed_files.append(file_path)
-                    filename = os.path.basename(file_path)
-                    info = extract_info_from_filename(filename)
-                    if info:
-                        current_notification_id = info['notification_id']
-            
-            if current_notification_id:
-                self.save_last_processed_to_table(current_notification_id)
-                logger.info(f"Saved last processed ID: {current_notification_id}")
-            
-            logger.info("Successfully saved all Excel files to ChromaDB")
-            self._cleanup_processed_files(processed_files)
+            result = upsert_in_batches(
+                collection,
+                [document['id'] for document in documents],
+                [document['document'] for document in documents],
+                [document['metadata'] for document in documents],
+                self.client.embedding_function
+            )
+            failed_ids = set(result['failed_ids'])
+            saved_ids = {document['id'] for document in documents if document['id'] not in failed_ids}
+
+            if advance_cursor:
+                self.advance_cursor(
+                    (document['metadata']['notification_id'], document['id'] not in failed_ids)
+                    for document in documents
+                )
+
+            logger.info(f"Saved {len(saved_ids)} of {len(documents)} table documents to ChromaDB ({result['docs_per_second']:.1f} docs/sec)")
+            return saved_ids
             
         except Exception as e:
             logger.error(f"Error in save_to_chroma: {e}")
             raise
 
+def contiguous_cursor(outcomes, skipped=()):
+    """Takes (notification_id, saved) pairs in notification order and returns the last notification
+    whose entries were all saved before the first failure, so a failed notification is retried.
+    Failures of skipped notifications do not stop the cursor."""
+    last_complete = None
+    current = None
+    for notification_id, saved in outcomes:
+        if not saved and notification_id not in skipped:
+            return last_complete if notification_id == current else current
+        if notification_id != current:
+            last_complete, current = current, notification_id
+    return current
+
 def extract_info_from_filename(filename):
     pattern = r'(\d+)_table_(\d+)_chunk_(\d+)'
     match = re.search(pattern, filename)
@@ -130,6 +198,30 @@ def extract_info_from_filename(filename):
         }
     return None
 
+def load_excel_document(file_path):
+    filename = os.path.basename(file_path)
+    info = extract_info_from_filename(filename)
+    if not info:
+        logger.warning(f"Could not extract info from filename: {filename}")
+        return None
+
+    df = pd.read_excel(file_path)
+    return {
+        'file_path': file_path,
+        'id': filename.replace('.xlsx', '').replace('.xls', ''),
+        'document': excel_to_json(df),
+        'metadata': build_table_metadata(info['notification_id'], info['table_num'], info['chunk_index'], filename)
+    }
+
+def build_table_metadata(notification_id, table_num, chunk_index, filename):
+    return {
+        'notification_id': int(notification_id),
+        'table_num': int(table_num),
+        'chunk_index': int(chunk_index),
+        'filename': str(filename),
+        'content_type': 'excel_json'
+    }
+
 def excel_to_json(df):
     records = df.to_dict(orient='records')
     return json.dumps(records, ensure_ascii=False)
@@ -0,0 +1,75 @@
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+import numpy as np
+from ..core.config import config
+from ..core.embedding_engine import embedding_model_id
+
+logger = logging.getLogger(__name__)
+
+_dedup_index = None
+_dedup_lock = threading.Lock()
+
+
+def normalize_document(text):
+    # all-MiniLM-L6-v2 is uncased and its tokenizer ignores whitespace runs, so case and
+    # spacing differences produce the same vector.
+    return ' '.join(str(text).lower().split())
+
+
+class EmbeddingDedupIndex:
+    """Content-addressed store of embeddings keyed by the hash of the normalized document text."""
+
+    def __init__(self, path, model_name):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.model_name = model_name
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL, created_at REAL NOT NULL)"
+        )
+        self._connection.commit()
+
+    def key(self, text):
+        raw = f"{self.model_name}:{normalize_document(text)}"
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def get_many(self, keys):
+        found = {}
+        with self._lock:
+            for start in range(0, len(keys), 500):
+                batch = keys[start:start + 500]
+                placeholders = ','.join('?' * len(batch))
+                rows = self._connection.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", batch
+                ).fetchall()
+                found.update((key, np.frombuffer(vector, dtype=np.float32)) for key, vector in rows)
+        return found
+
+    def set_many(self, items):
+        if not items:
+            return
+        now = time.time()
+        with self._lock:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector, created_at) VALUES (?, ?, ?)",
+                [(key, np.asarray(vector, dtype=np.float32).tobytes(), now) for key, vector in items.items()]
+            )
+            self._connection.commit()
+
+
+def get_dedup_index():
+    global _dedup_index
+    if not config.EMBEDDING_DEDUP_ENABLED:
+        return None
+    if _dedup_index is None:
+        with _dedup_lock:
+            if _dedup_index is None:
+                _dedup_index = EmbeddingDedupIndex(config.EMBEDDING_DEDUP_PATH, embedding_model_id())
+    return _dedup_index
@@ -0,0 +1,237 @@
+import bisect
+import difflib
+import heapq
+import logging
+import os
+import re
+import sqlite3
+import threading
+from collections import Counter
+from ..core.config import config
+
+logger = logging.getLogger(__name__)
+
+_notification_index = None
+_notification_lock = threading.Lock()
+
+# Listing titles are "<company name> <stock code(s)>", e.g. "TÜRK HAVA YOLLARI A.O. THYAO".
+_COMPANY_CODES = re.compile(r'\s+((?:[A-Z0-9]{3,6})(?:\s*,\s*[A-Z0-9]{3,6})*)$')
+# Users type company names with or without Turkish characters, so both sides fold to ASCII.
+_ASCII_FOLD = str.maketrans('İIıŞşĞğÜüÖöÇçÂâÎîÛû', 'iiissgguuoouuaaiiuu')
+# Fuzzy lookups compare against name prefixes of up to this many words; longer queries use full names.
+_FUZZY_PREFIX_WORDS = 4
+# Only the candidates sharing the most trigrams with the query are scored by difflib.
+_FUZZY_SHORTLIST = 50
+
+
+def normalize_company(text):
+    text = str(text).translate(_ASCII_FOLD).lower()
+    return ' '.join(re.sub(r'[^\w\s]', ' ', text).split())
+
+
+def trigrams(text):
+    padded = f" {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def split_title(title):
+    title = ' '.join(str(title).split())
+    match = _COMPANY_CODES.search(title)
+    if not match:
+        return title, []
+    codes = [code.strip() for code in match.group(1).split(',')]
+    return title[:match.start()], codes
+
+
+class NotificationIndex:
+    """SQLite index of title-document metadata: notification_id, company, codes, history and period.
+
+    Lookups run against an in-memory snapshot: a sorted array of company names for whole-word
+    prefix search, word-prefix maps for fuzzy search, a code map, and per-company notifications
+    sorted by history for date-range bisection. The snapshot is reloaded when another connection
+    (an ingestion worker) commits to the file.
+    """
+
+    def __init__(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS notifications ("
+            "notification_id INTEGER PRIMARY KEY, title TEXT NOT NULL, company TEXT NOT NULL, "
+            "codes TEXT NOT NULL, history TEXT NOT NULL, period TEXT NOT NULL)"
+        )
+        self._connection.execute("CREATE INDEX IF NOT EXISTS notifications_company ON notifications (company, history)")
+        self._connection.execute("CREATE INDEX IF NOT EXISTS notifications_history ON notifications (history)")
+        self._connection.execute("CREATE TABLE IF NOT EXISTS index_meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        self._connection.commit()
+        self._data_version = None
+        self._names = []
+        self._codes = {}
+        self._by_company = {}
+        self._word_prefixes = {}
+
+    def add_many(self, records):
+        rows = []
+        for record in records:
+            company, codes = split_title(record['title'])
+            rows.append((
+                int(record['notification_id']),
+                str(record['title']),
+                normalize_company(company),
+                ','.join(codes),
+                str(record.get('history') or ''),
+                str(record.get('period') or '')
+            ))
+        if not rows:
+            return 0
+        with self._lock:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO notifications (notification_id, title, company, codes, history, period) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            self._connection.commit()
+            # data_version only tracks other connections' commits.
+            self._data_version = None
+        return len(rows)
+
+    def backfill(self, collection, page_size=5000):
+        """Loads title documents from an existing Chroma collection, for indexes created after ingestion."""
+        added = 0
+        offset = 0
+        while True:
+            page = collection.get(where={"is_title": True}, include=["metadatas"], limit=page_size, offset=offset)
+            metadatas = page['metadatas']
+            added += self.add_many(meta for meta in metadatas if meta.get('notification_id') is not None)
+            if len(metadatas) < page_size:
+                break
+            offset += page_size
+        with self._lock:
+            self._connection.execute("INSERT OR REPLACE INTO index_meta (key, value) VALUES ('backfilled', '1')")
+            self._connection.commit()
+        logger.info(f"Notification index backfilled with {added} notifications")
+        return added
+
+    @property
+    def backfilled(self):
+        # Ingestion workers add titles as they are saved, so a non-empty index may still miss
+        # everything ingested before it existed; only a completed backfill marks it complete.
+        with self._lock:
+            row = self._connection.execute("SELECT value FROM index_meta WHERE key = 'backfilled'").fetchone()
+            return row is not None
+
+    def __len__(self):
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM notifications").fetchone()[0]
+
+    def _refresh(self):
+        data_version = self._connection.execute("PRAGMA data_version").fetchone()[0]
+        if data_version == self._data_version:
+            return
+
+        rows = self._connection.execute(
+            "SELECT company, codes, history, period, notification_id FROM notifications ORDER BY company, history"
+        ).fetchall()
+        by_company = {}
+        codes = {}
+        for company, company_codes, history, period, notification_id in rows:
+            by_company.setdefault(company, ([], []))
+            by_company[company][0].append(history)
+            by_company[company][1].append((period, notification_id))
+            for code in filter(None, company_codes.split(',')):
+                codes.setdefault(code.lower(), set()).add(company)
+
+        # Fuzzy candidates are name prefixes of the query's word count, so "turk hava yolari"
+        # scores against "turk hava yollari" rather than the full legal name.
+        word_prefixes = {}
+        for name in by_company:
+            words = name.split()
+            for word_count in range(1, _FUZZY_PREFIX_WORDS + 1):
+                word_prefixes.setdefault(word_count, {}).setdefault(' '.join(words[:word_count]), []).append(name)
+            word_prefixes.setdefault(None, {}).setdefault(name, []).append(name)
+
+        self._by_company = by_company
+        self._codes = codes
+        self._names = sorted(by_company)
+        self._word_prefixes = {}
+        for word_count, prefixes in word_prefixes.items():
+            grams = {}
+            for prefix in prefixes:
+                for gram in trigrams(prefix):
+                    grams.setdefault(gram, []).append(prefix)
+            self._word_prefixes[word_count] = (prefixes, grams)
+        self._data_version = data_version
+
+    def _prefix_matches(self, query):
+        # Whole-word prefixes only: "is" matches "is yatirim ..." but not "isbir" or "isdemir".
+        # Names are sorted, so those starting with the query and a space form one contiguous run.
+        prefix = query + ' '
+        start = bisect.bisect_left(self._names, prefix)
+        end = bisect.bisect_left(self._names, query + chr(ord(' ') + 1), lo=start)
+        return sorted(self._names[start:end], key=len)
+
+    def _fuzzy_matches(self, query, cutoff):
+        word_count = len(query.split())
+        prefixes, grams = self._word_prefixes.get(word_count if word_count <= _FUZZY_PREFIX_WORDS else None, ({}, {}))
+        shared = Counter()
+        for gram in trigrams(query):
+            shared.update(grams.get(gram, ()))
+        candidates = [prefix for prefix, _ in heapq.nlargest(_FUZZY_SHORTLIST, shared.items(), key=lambda item: item[1])]
+
+        matches = []
+        for prefix in difflib.get_close_matches(query, candidates, n=3, cutoff=cutoff):
+            matches.extend(sorted(prefixes[prefix], key=len))
+        return matches
+
+    def _match_companies(self, company, cutoff):
+        query = normalize_company(company)
+        if not query:
+            return []
+        self._refresh()
+        if query in self._codes:
+            return sorted(self._codes[query])
+        if query in self._by_company:
+            return [query]
+        # Like the former top-3 title search, only the closest few companies are used: shortest
+        # names first for prefixes, best score first for fuzzy matches.
+        matches = self._prefix_matches(query) or self._fuzzy_matches(query, cutoff or config.NOTIFICATION_INDEX_FUZZY_CUTOFF)
+        return matches[:config.NOTIFICATION_INDEX_MAX_COMPANIES]
+
+    def match_companies(self, company, cutoff=None):
+        with self._lock:
+            return self._match_companies(company, cutoff)
+
+    def resolve(self, company, start_date=None, end_date=None, period=None, limit=None):
+        """Returns notification ids of the matched companies, newest first, or None if no company matched."""
+        matches = []
+        with self._lock:
+            companies = self._match_companies(company, None)
+            if not companies:
+                return None
+            for name in companies:
+                histories, entries = self._by_company[name]
+                low = bisect.bisect_left(histories, start_date) if start_date and end_date else 0
+                high = bisect.bisect_right(histories, end_date) if start_date and end_date else len(histories)
+                matches.extend(
+                    (histories[i], entries[i][1]) for i in range(low, high)
+                    if not period or entries[i][0] == period
+                )
+
+        matches.sort(reverse=True)
+        notification_ids = [notification_id for _, notification_id in matches]
+        return notification_ids[:limit or config.NOTIFICATION_INDEX_MAX_IDS]
+
+
+def get_notification_index():
+    global _notification_index
+    if not config.NOTIFICATION_INDEX_ENABLED:
+        return None
+    if _notification_index is None:
+        with _notification_lock:
+            if _notification_index is None:
+                _notification_index = NotificationIndex(config.NOTIFICATION_INDEX_PATH)
+    return _notification_index
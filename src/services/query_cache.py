@@ -0,0 +1,146 @@
+import copy
+import hashlib
+import json
+import logging
+import threading
+import numpy as np
+from ..core.cache import LRUCache
+from ..core.client import RedisClient
+from ..core.config import config
+from .notification_index import normalize_company
+
+logger = logging.getLogger(__name__)
+
+# Semantic hits tolerate Turkish inflection: words are compared by their first few folded characters.
+_STEM_LENGTH = 5
+
+
+class QueryAnalysisCache:
+    def __init__(self, embedding_function=None):
+        self.ttl_seconds = config.ANALYSIS_CACHE_TTL_SECONDS
+        self.local = LRUCache(config.ANALYSIS_CACHE_MAX_ENTRIES, self.ttl_seconds, name="query_analysis")
+        self.redis = RedisClient().client if config.ANALYSIS_CACHE_REDIS_ENABLED else None
+        self.embedding_function = embedding_function if config.ANALYSIS_CACHE_SEMANTIC_ENABLED else None
+        self.semantic = LRUCache(config.ANALYSIS_CACHE_MAX_ENTRIES, self.ttl_seconds, name="query_analysis_semantic")
+        self.threshold = config.ANALYSIS_CACHE_SEMANTIC_THRESHOLD
+        self._lock = threading.Lock()
+        self._hits = {"local": 0, "redis": 0, "semantic": 0}
+        self._misses = 0
+
+    @staticmethod
+    def normalize(question):
+        question = ' '.join(str(question).split()).lower()
+        return question.rstrip('?!. ')
+
+    @staticmethod
+    def signature(normalized):
+        # Questions about different companies, years or periods embed almost identically
+        # ("thyao 2023 net kâr" vs "pgsus 2023 net kâr"), so a semantic hit must not differ in
+        # any token; only word order, punctuation, Turkish characters and suffixes may vary.
+        return frozenset(
+            token if any(char.isdigit() for char in token) else token[:_STEM_LENGTH]
+            for token in normalize_company(normalized).split()
+        )
+
+    def _key(self, normalized):
+        return hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+
+    def _count(self, tier=None):
+        with self._lock:
+            if tier is None:
+                self._misses += 1
+            else:
+                self._hits[tier] += 1
+
+    def _redis_get(self, key):
+        if self.redis is None:
+            return None
+        try:
+            cached = self.redis.get(f"kap:query_analysis:{key}")
+            return json.loads(cached) if cached else None
+        except Exception as e:
+            logger.warning(f"Query analysis cache Redis lookup failed: {e}")
+            return None
+
+    def _redis_set(self, key, analysis):
+        if self.redis is None:
+            return
+        try:
+            self.redis.setex(f"kap:query_analysis:{key}", self.ttl_seconds, json.dumps(analysis, ensure_ascii=False))
+        except Exception as e:
+            logger.warning(f"Query analysis cache Redis write failed: {e}")
+
+    def _embed(self, normalized):
+        vector = np.asarray(self.embedding_function([normalized])[0], dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _semantic_get(self, vector, signature):
+        entries = [entry for entry in self.semantic.values() if entry[2] == signature]
+        if not entries:
+            return None
+        matrix = np.vstack([entry[0] for entry in entries])
+        scores = matrix @ vector
+        best = int(np.argmax(scores))
+        if scores[best] >= self.threshold:
+            return entries[best][1]
+        return None
+
+    def _result(self, analysis, question=None):
+        # Exact hits return the stored analysis as computed; a semantic hit came from a differently
+        # worded question, so its extracted search query is replaced by the caller's question.
+        analysis = copy.deepcopy(analysis)
+        if question is not None:
+            analysis.setdefault('args', {})['query'] = question
+        return analysis
+
+    def get_or_compute(self, question, compute):
+        normalized = self.normalize(question)
+        key = self._key(normalized)
+
+        analysis = self.local.get(key)
+        if analysis is not None:
+            self._count("local")
+            return self._result(analysis)
+
+        analysis = self._redis_get(key)
+        if analysis is not None:
+            self.local.set(key, analysis)
+            self._count("redis")
+            return self._result(analysis)
+
+        vector = None
+        if self.embedding_function is not None:
+            try:
+                vector = self._embed(normalized)
+                analysis = self._semantic_get(vector, self.signature(normalized))
+            except Exception as e:
+                logger.warning(f"Query analysis semantic lookup failed: {e}")
+            if analysis is not None:
+                analysis = self._result(analysis, question)
+                self.local.set(key, copy.deepcopy(analysis))
+                self._count("semantic")
+                return analysis
+
+        self._count()
+        analysis = compute(question)
+        self.local.set(key, copy.deepcopy(analysis))
+        self._redis_set(key, analysis)
+        if vector is not None:
+            self.semantic.set(key, (vector, copy.deepcopy(analysis), self.signature(normalized)))
+        return analysis
+
+    def stats(self):
+        with self._lock:
+            hits = dict(self._hits)
+            misses = self._misses
+        lookups = sum(hits.values()) + misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(sum(hits.values()) / lookups, 4) if lookups else 0.0,
+            "redis_enabled": self.redis is not None,
+            "semantic_enabled": self.embedding_function is not None,
+            "local": self.local.stats(),
+            "semantic": self.semantic.stats()
+        }
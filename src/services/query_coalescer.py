@@ -0,0 +1,98 @@
+import copy
+import json
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class _Batch:
+    def __init__(self, collection):
+        self.collection = collection
+        self.texts = []
+        self.full = threading.Event()
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class QueryCoalescer:
+    """Merges concurrent single-text queries into one multi-text Chroma query.
+
+    Chroma applies one where filter and n_results to every text of a query, so only queries
+    that agree on collection, n_results, where and include share a batch. The first caller
+    of a batch waits up to window_ms for others, runs the query through execute and every
+    caller takes its own row of the result.
+    """
+
+    def __init__(self, execute, window_ms=3, max_batch_size=32):
+        self.execute = execute
+        self.window = window_ms / 1000.0
+        self.max_batch_size = max(1, max_batch_size)
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._stats = {"queries": 0, "batches": 0, "texts_sent": 0}
+
+    def _key(self, collection, n_results, where, include):
+        return (collection.name, n_results, json.dumps(where, sort_keys=True, default=str), tuple(include or ()))
+
+    def query(self, collection, query_text, n_results=10, where=None, include=None):
+        key = self._key(collection, n_results, where, include)
+        with self._lock:
+            self._stats["queries"] += 1
+            batch = self._pending.get(key)
+            leader = batch is None
+            if leader:
+                batch = self._pending[key] = _Batch(collection)
+            if query_text not in batch.texts:
+                batch.texts.append(query_text)
+            index = batch.texts.index(query_text)
+            if len(batch.texts) >= self.max_batch_size:
+                del self._pending[key]
+                batch.full.set()
+
+        if leader:
+            batch.full.wait(self.window)
+            with self._lock:
+                if self._pending.get(key) is batch:
+                    del self._pending[key]
+                self._stats["batches"] += 1
+                self._stats["texts_sent"] += len(batch.texts)
+            self._run(batch, n_results, where, include)
+        else:
+            batch.done.wait()
+
+        if batch.error is not None:
+            raise batch.error
+        return self._split(batch.result, index)
+
+    def _run(self, batch, n_results, where, include):
+        kwargs = {"query_texts": batch.texts, "n_results": n_results}
+        if where is not None:
+            kwargs["where"] = where
+        if include is not None:
+            kwargs["include"] = include
+        try:
+            batch.result = self.execute(batch.collection, **kwargs)
+        except Exception as e:
+            logger.error(f"Coalesced query of {len(batch.texts)} texts on '{batch.collection.name}' failed: {e}")
+            batch.error = e
+        finally:
+            batch.done.set()
+
+    def _split(self, result, index):
+        # Per-query fields are lists with one row per query text; "included" names the fields.
+        # Rows are copied since callers annotate the returned metadatas in place.
+        return {
+            field: value if field == "included" or value is None else [copy.deepcopy(value[index])]
+            for field, value in result.items()
+        }
+
+    def stats(self):
+        with self._lock:
+            batches = self._stats["batches"]
+            return {
+                **self._stats,
+                "avg_batch_size": round(self._stats["texts_sent"] / batches, 2) if batches else 0.0,
+                "round_trips_saved": self._stats["queries"] - batches
+            }
@@ -0,0 +1,291 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from deep_translator import GoogleTranslator
+from ..core.client import RedisClient
+from ..core.concurrency import stage_limiter
+from ..core.config import config
+
+logger = logging.getLogger(__name__)
+
+
+class GoogleTranslationBackend:
+    name = "google"
+
+    def __init__(self, source='tr', target='en', max_batch_chars=4500):
+        self.source = source
+        self.target = target
+        self.max_batch_chars = max_batch_chars
+        self._local = threading.local()
+
+    def _translator(self):
+        translator = getattr(self._local, 'translator', None)
+        if translator is None:
+            translator = GoogleTranslator(source=self.source, target=self.target)
+            self._local.translator = translator
+        return translator
+
+    def _translate_group(self, texts):
+        translator = self._translator()
+        if len(texts) == 1:
+            return [translator.translate(texts[0])]
+
+        translated = translator.translate('\n'.join(texts))
+        parts = translated.split('\n') if translated else []
+        if len(parts) != len(texts):
+            logger.debug("Batched translation changed line count, translating items one by one")
+            return [translator.translate(text) for text in texts]
+        return [part.strip() for part in parts]
+
+    def translate_batch(self, texts):
+        results = []
+        group = []
+        group_chars = 0
+
+        for text in texts:
+            if '\n' in text or len(text) >= self.max_batch_chars:
+                if group:
+                    results.extend(self._translate_group(group))
+                    group, group_chars = [], 0
+                results.append(self._translator().translate(text))
+                continue
+
+            if group and group_chars + len(text) + 1 > self.max_batch_chars:
+                results.extend(self._translate_group(group))
+                group, group_chars = [], 0
+            group.append(text)
+            group_chars += len(text) + 1
+
+        if group:
+            results.extend(self._translate_group(group))
+        return results
+
+
+class IdentityTranslationBackend:
+    name = "identity"
+
+    def translate_batch(self, texts):
+        return list(texts)
+
+
+class MarianTranslationBackend:
+    name = "marian"
+
+    def __init__(self, model_name):
+        from transformers import pipeline
+        self._pipeline = pipeline("translation", model=model_name)
+        self._lock = threading.Lock()
+
+    def translate_batch(self, texts):
+        with self._lock:
+            outputs = self._pipeline(list(texts), truncation=True)
+        return [output['translation_text'] for output in outputs]
+
+
+class NullTranslationCache:
+    def get_many(self, keys):
+        return {}
+
+    def set_many(self, items):
+        pass
+
+
+class SQLiteTranslationCache:
+    def __init__(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS translations (key TEXT PRIMARY KEY, translation TEXT NOT NULL, created_at REAL NOT NULL)"
+        )
+        self._connection.commit()
+
+    def get_many(self, keys):
+        found = {}
+        with self._lock:
+            for start in range(0, len(keys), 500):
+                batch = keys[start:start + 500]
+                placeholders = ','.join('?' * len(batch))
+                rows = self._connection.execute(
+                    f"SELECT key, translation FROM translations WHERE key IN ({placeholders})", batch
+                ).fetchall()
+                found.update(rows)
+        return found
+
+    def set_many(self, items):
+        if not items:
+            return
+        now = time.time()
+        with self._lock:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO translations (key, translation, created_at) VALUES (?, ?, ?)",
+                [(key, value, now) for key, value in items.items()]
+            )
+            self._connection.commit()
+
+
+class RedisTranslationCache:
+    def __init__(self, ttl_seconds=None):
+        self.client = RedisClient().client
+        self.ttl_seconds = ttl_seconds
+
+    def get_many(self, keys):
+        if not keys:
+            return {}
+        values = self.client.mget([f"kap:translation:{key}" for key in keys])
+        return {key: value for key, value in zip(keys, values) if value is not None}
+
+    def set_many(self, items):
+        if not items:
+            return
+        pipeline = self.client.pipeline()
+        for key, value in items.items():
+            pipeline.set(f"kap:translation:{key}", value, ex=self.ttl_seconds)
+        pipeline.execute()
+
+
+class TranslationService:
+    def __init__(self, backend, cache, source='tr', target='en', batch_size=16, workers=1):
+        self.backend = backend
+        self.cache = cache
+        self.source = source
+        self.target = target
+        self.batch_size = max(1, batch_size)
+        self.workers = max(1, workers)
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="translate") if self.workers > 1 else None
+        self._lock = threading.Lock()
+        self._stats = {"texts": 0, "cache_hits": 0, "translated": 0, "backend_calls": 0, "errors": 0}
+
+    def _key(self, text):
+        raw = f"{self.backend.name}:{self.source}:{self.target}:{text}"
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def _count(self, **counts):
+        with self._lock:
+            for name, value in counts.items():
+                self._stats[name] += value
+
+    def _cache_get(self, keys):
+        try:
+            return self.cache.get_many(keys)
+        except Exception as e:
+            logger.warning(f"Translation cache lookup failed: {e}")
+            return {}
+
+    def _cache_set(self, items):
+        try:
+            self.cache.set_many(items)
+        except Exception as e:
+            logger.warning(f"Translation cache write failed: {e}")
+
+    def _translate_one_batch(self, batch):
+        try:
+            with stage_limiter.slot("translate"):
+                outputs = self.backend.translate_batch(batch)
+            self._count(backend_calls=1)
+            return outputs
+        except Exception as e:
+            logger.warning(f"Batch translation failed, retrying items one by one: {e}")
+            outputs = []
+            for text in batch:
+                try:
+                    with stage_limiter.slot("translate"):
+                        outputs.extend(self.backend.translate_batch([text]))
+                    self._count(backend_calls=1)
+                except Exception as item_error:
+                    logger.error(f"Translation error: {item_error}")
+                    self._count(errors=1)
+                    outputs.append(None)
+            return outputs
+
+    def _translate_missing(self, texts):
+        batches = [texts[start:start + self.batch_size] for start in range(0, len(texts), self.batch_size)]
+        # Batches run on the bounded pool; map keeps their order so outputs line up with texts.
+        if self._executor is not None and len(batches) > 1:
+            outputs = self._executor.map(self._translate_one_batch, batches)
+        else:
+            outputs = map(self._translate_one_batch, batches)
+
+        translated = {}
+        for batch, batch_outputs in zip(batches, outputs):
+            for text, output in zip(batch, batch_outputs):
+                if output:
+                    translated[text] = output
+        return translated
+
+    def translate_batch(self, texts):
+        results = list(texts)
+        positions = {}
+        for i, text in enumerate(texts):
+            if isinstance(text, str) and text.strip():
+                positions.setdefault(text, []).append(i)
+        if not positions:
+            return results
+
+        keys = {text: self._key(text) for text in positions}
+        cached = self._cache_get(list(keys.values()))
+        missing = [text for text in positions if keys[text] not in cached]
+        translated = self._translate_missing(missing) if missing else {}
+        self._cache_set({keys[text]: value for text, value in translated.items()})
+        self._count(texts=len(positions), cache_hits=len(positions) - len(missing), translated=len(translated))
+
+        for text, indices in positions.items():
+            value = cached.get(keys[text]) or translated.get(text) or text
+            for i in indices:
+                results[i] = value
+        return results
+
+    def translate(self, text):
+        if isinstance(text, dict):
+            text = json.dumps(text, ensure_ascii=False)
+        return self.translate_batch([text])[0]
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+        stats["backend"] = self.backend.name
+        stats["cache_hit_rate"] = round(stats["cache_hits"] / stats["texts"], 4) if stats["texts"] else 0.0
+        return stats
+
+
+def create_translation_backend(name):
+    if name == "identity":
+        return IdentityTranslationBackend()
+    if name == "marian":
+        return MarianTranslationBackend(config.TRANSLATION_MODEL_NAME)
+    return GoogleTranslationBackend(max_batch_chars=config.TRANSLATION_MAX_BATCH_CHARS)
+
+
+def create_translation_cache(name):
+    if name == "redis":
+        return RedisTranslationCache()
+    if name == "sqlite":
+        return SQLiteTranslationCache(config.TRANSLATION_CACHE_PATH)
+    return NullTranslationCache()
+
+
+_translation_service = None
+_translation_lock = threading.Lock()
+
+
+def get_translation_service():
+    global _translation_service
+    if _translation_service is None:
+        with _translation_lock:
+            if _translation_service is None:
+                _translation_service = TranslationService(
+                    backend=create_translation_backend(config.TRANSLATION_BACKEND),
+                    cache=create_translation_cache(config.TRANSLATION_CACHE_BACKEND),
+                    batch_size=config.TRANSLATION_BATCH_SIZE,
+                    workers=config.TRANSLATE_CONCURRENCY
+                )
+                logger.info(f"Translation service using '{config.TRANSLATION_BACKEND}' backend with '{config.TRANSLATION_CACHE_BACKEND}' cache")
+    return _translation_service
@@ -1,7 +1,11 @@
+from celery import chord
 from ..core.celery_app import celery_app
 from ..scrapers.excel_to_html import ExcelToHtml
+from ..processors.excel_processor import ExcelProcessor
+from ..processors.table_pipeline import TablePipeline, process_html_file
 from ..services.chroma_table_service import ChromaTableService
 import logging
+import os
 
 logger = logging.getLogger(__name__)
 
@@ -16,3 +20,38 @@ def save_tables_to_chroma():
     scraper = ChromaTableService()
     scraper.save_to_chroma_table()
     return {"status": "success", "message": "Tables saved to ChromaDB"}
+
+@celery_app.task(name='process_table_html')
+def process_table_html(html_file):
+    # A raised header task would stop the chord callback and drop every file's documents,
+    # so unexpected errors are reported as a failed file instead.
+    try:
+        return process_html_file(html_file)
+    except Exception as e:
+        logger.error(f"{html_file} table task error: {e}")
+        return {
+            "html_file": html_file,
+            "notification_id": os.path.basename(html_file).replace('.html', ''),
+            "documents": [],
+            "failed": True,
+            "timings": None
+        }
+
+@celery_app.task(name='save_table_results')
+def save_table_results(results):
+    report = TablePipeline(ExcelProcessor()).finish(results)
+    return {"status": "success", "message": "Excel processing completed", "report": report}
+
+@celery_app.task(name='recover_table_files')
+def recover_table_files(html_files):
+    # Runs when the chord fails anyway (e.g. a lost worker): nothing was saved or deleted,
+    # so the files still on disk are processed in this worker.
+    remaining = [html_file for html_file in html_files if os.path.exists(html_file)]
+    logger.warning(f"Table chord failed; processing {len(remaining)} HTML files locally")
+    report = TablePipeline(ExcelProcessor()).run(remaining)
+    return {"status": "success", "message": "Excel processing recovered", "report": report}
+
+def dispatch_table_files(html_files):
+    html_files = list(html_files)
+    callback = save_table_results.s().on_error(recover_table_files.si(html_files))
+    return chord(process_table_html.s(html_file) for html_file in html_files)(callback)
@@ -0,0 +1,100 @@
+import json
+import logging
+import os
+import threading
+from ..core.config import config
+
+logger = logging.getLogger(__name__)
+
+
+class NotificationStore:
+    """Append-only JSONL file of scraped notifications with a committed read offset."""
+
+    def __init__(self, path=None):
+        self.path = path or config.NOTIFICATION_STORE_PATH
+        self.offset_path = f"{self.path}.offset"
+        self._lock = threading.Lock()
+
+    def _ensure_line_boundary(self, f):
+        # A crash can leave a partial last line; start the next record on a fresh line.
+        if f.tell() > 0:
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b'\n':
+                f.write(b'\n')
+
+    def append(self, record):
+        line = (json.dumps(record, ensure_ascii=False) + '\n').encode('utf-8')
+        with self._lock:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            with open(self.path, 'a+b') as f:
+                self._ensure_line_boundary(f)
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+
+    def read_offset(self):
+        try:
+            with open(self.offset_path, 'r') as f:
+                return int(json.load(f).get('offset', 0))
+        except FileNotFoundError:
+            return 0
+        except Exception as e:
+            logger.error(f"Error reading notification store offset: {e}")
+            return 0
+
+    def commit(self, offset):
+        tmp_path = f"{self.offset_path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({'offset': offset}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.offset_path)
+
+    def iter_batches(self, batch_size=None):
+        batch_size = batch_size or config.NOTIFICATION_STORE_BATCH_SIZE
+        if not os.path.exists(self.path):
+            return
+
+        offset = committed = self.read_offset()
+        batch = []
+        with open(self.path, 'rb') as f:
+            f.seek(offset)
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break
+                offset += len(line)
+                if not line.strip():
+                    continue
+                try:
+                    batch.append(json.loads(line))
+                except ValueError:
+                    logger.warning(f"Skipping unreadable record at offset {offset - len(line)} in {self.path}")
+                    continue
+                if len(batch) >= batch_size:
+                    yield offset, batch
+                    committed, batch = offset, []
+        if batch or offset != committed:
+            yield offset, batch
+
+    def last_id(self):
+        if not os.path.exists(self.path):
+            return None
+
+        last_id = None
+        with open(self.path, 'rb') as f:
+            for line in f:
+                try:
+                    record_id = int(json.loads(line)['id'])
+                except (ValueError, KeyError, TypeError):
+                    continue
+                last_id = record_id if last_id is None else max(last_id, record_id)
+        return last_id
+
+    def compact(self):
+        with self._lock:
+            if not os.path.exists(self.path):
+                return
+            if self.read_offset() >= os.path.getsize(self.path):
+                open(self.path, 'wb').close()
+                self.commit(0)
+                logger.info(f"Compacted fully consumed notification store: {self.path}")
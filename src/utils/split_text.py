@@ -1,78 +1,124 @@
 import re
 import pandas as pd
-from deep_translator import GoogleTranslator
+from ..core.config import config
+from ..services.translation_service import get_translation_service
+from .token_chunker import split_text_into_token_chunks
+
+def _normalize_chunk(chunk):
+    chunk = chunk.replace('\n', ' ').replace('\r', ' ')
+    return ' '.join(chunk.split())
 
 def translate_chunk(chunk):
-    translator = GoogleTranslator(source='tr', target='en')
-    try:
-        chunk = chunk.replace('\n', ' ').replace('\r', ' ')
-        chunk = ' '.join(chunk.split())  
-        if not chunk.strip():
-            return chunk
-            
-        translation = translator.translate(chunk)
-              
-        return translation
-    except Exception as e:
-        print(f"Translation error: {e}")
+    chunk = _normalize_chunk(chunk)
+    if not chunk.strip():
         return chunk
+    return get_translation_service().translate(chunk)
+
+def translate_chunks(chunks):
+    return get_translation_service().translate_batch([_normalize_chunk(chunk) for chunk in chunks])
+
+_SENTENCE_BREAK = re.compile(r'[.!?] ')
+
+def _normalize_text(text):
+    text = str(text).strip()
+    text = text.replace('\n', ' ').replace('\r', ' ')
+    return ' '.join(text.split())
+
+def sentence_spans(text):
+    # text is normalized, so words are separated by exactly one space and a sentence
+    # ends at every '.', '!' or '?' that is followed by a space.
+    spans = []
+    start = 0
+    for match in _SENTENCE_BREAK.finditer(text):
+        end = match.start() + 1
+        spans.append((start, end, text.count(' ', start, end) + 1))
+        start = end + 1
+    if start < len(text):
+        spans.append((start, len(text), text.count(' ', start) + 1))
+    return spans
+
+def chunk_spans(text, spans, min_words=300, max_words=320, compat=True):
+    """Groups sentence spans into (start, end) character ranges of text.
+
+    Every chunk is a contiguous run of words, so chunks are sliced out of text once instead of
+    being rebuilt from word lists. A chunk closed at min_words on a sentence end is followed by a
+    chunk that starts with that sentence again. In compat mode, when that carried sentence
+    plus the next one exceed max_words, the carried sentence is emitted alone, exactly as the
+    list-based implementation did. Otherwise it is dropped.
+    """
+    ranges = []
+    chunk_start = None
+    chunk_end = 0
+    word_count = 0
+    carried = None
+
+    for start, end, sentence_word_count in spans:
+        if chunk_start is None and carried:
+            if compat or carried[2] + sentence_word_count <= max_words:
+                chunk_start, chunk_end, word_count = carried
+
+        if chunk_start is not None and word_count + sentence_word_count > max_words:
+            ranges.append((chunk_start, chunk_end))
+            chunk_start, word_count = start, sentence_word_count
+        else:
+            if chunk_start is None:
+                chunk_start = start
+            word_count += sentence_word_count
+        chunk_end = end
 
-def split_text_into_sentences(text, min_words=300, max_words=320):
+        if word_count >= min_words and text[end - 1] in '.!?':
+            carried = (start, end, sentence_word_count)
+            ranges.append((chunk_start, end))
+            chunk_start, word_count = None, 0
+
+    if chunk_start is not None:
+        ranges.append((chunk_start, chunk_end))
+    return ranges
+
+def split_text_into_sentences(text, min_words=300, max_words=320, translate=True, compat=True):
     if not text or pd.isna(text):  
         return []
 
-    text = str(text).strip()
+    text = _normalize_text(text)
     if not text:  
         return []
 
-    text = text.replace('\n', ' ').replace('\r', ' ')
-    text = ' '.join(text.split())  
-
-    text = re.sub(r'([.!?])\s+', r'\1\n', text)
-    sentences = text.split('\n')
-    
-    chunks = []
-    current_chunk = []
-    current_word_count = 0
-    last_sentence = None
-    
-    for sentence in sentences:
-        sentence = sentence.strip()
-        if not sentence:
-            continue
-            
-        sentence_words = sentence.split()
-        sentence_word_count = len(sentence_words)
-        
-        if not current_chunk and last_sentence:
-            current_chunk.extend(last_sentence.split())
-            current_word_count = len(last_sentence.split())
-        
-        if current_word_count + sentence_word_count > max_words and current_chunk:
-            last_sentence = ' '.join(current_chunk[-sentence_word_count:]) if sentence_word_count < len(current_chunk) else sentence
-            
-            chunk_text = ' '.join(current_chunk)
-            translated_chunk = translate_chunk(chunk_text)
-            chunks.append(translated_chunk)
-            
-            current_chunk = sentence_words
-            current_word_count = sentence_word_count
-        else:
-            current_chunk.extend(sentence_words)
-            current_word_count += sentence_word_count
-            
-        if current_word_count >= min_words and sentence.endswith(('.', '!', '?')):
-            last_sentence = sentence
-            
-            chunk_text = ' '.join(current_chunk)
-            translated_chunk = translate_chunk(chunk_text)
-            chunks.append(translated_chunk)
-            current_chunk = []
-            current_word_count = 0
-    
-    if current_chunk:
-        chunk_text = ' '.join(current_chunk)
-        translated_chunk = translate_chunk(chunk_text)
-        chunks.append(translated_chunk)
-    
-    return chunks
+    chunks = [text[start:end] for start, end in chunk_spans(text, sentence_spans(text), min_words, max_words, compat)]
+    return translate_chunks(chunks) if translate else chunks
+
+def translation_units(text, max_chars=None):
+    """Groups whole sentences into contiguous, non-overlapping runs of up to max_chars characters."""
+    if not text or pd.isna(text):
+        return []
+
+    text = _normalize_text(text)
+    if not text:
+        return []
+
+    max_chars = max_chars or config.CHUNK_TRANSLATION_UNIT_CHARS
+    units = []
+    unit_start = None
+    unit_end = 0
+    for start, end, _ in sentence_spans(text):
+        if unit_start is not None and end - unit_start > max_chars:
+            units.append(text[unit_start:unit_end])
+            unit_start = None
+        if unit_start is None:
+            unit_start = start
+        unit_end = end
+    if unit_start is not None:
+        units.append(text[unit_start:unit_end])
+    return units
+
+def pack_token_chunks(translated_units):
+    return split_text_into_token_chunks(' '.join(translated_units))
+
+def chunk_text(text, translate=True):
+    if config.CHUNKING_STRATEGY == "tokens":
+        if not translate:
+            return split_text_into_token_chunks(text)
+        # Token budgets are filled on the English text that gets embedded. Turkish words split
+        # into many more WordPiece pieces than their translations, so chunks packed on the
+        # source came out far below the budget after translation.
+        return pack_token_chunks(translate_chunks(translation_units(text)))
+    return split_text_into_sentences(text, translate=translate)
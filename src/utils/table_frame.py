@@ -0,0 +1,54 @@
+import logging
+import math
+import os
+import pandas as pd
+from pandas.io.parsers import TextParser
+from ..core.config import config
+
+logger = logging.getLogger(__name__)
+
+
+def _excel_cell(value):
+    if value is None or value is pd.NA or value is pd.NaT:
+        return ""
+    if isinstance(value, float):
+        if math.isnan(value):
+            return ""
+        if value.is_integer():
+            return int(value)
+    return value
+
+
+def excel_round_trip(df):
+    # Mirrors df.to_excel(index=False) followed by pd.read_excel(): empty cells and
+    # NA-like strings come back as NaN and columns get the reader's type inference,
+    # so in-memory tables serialize exactly like the former xlsx intermediates.
+    rows = [list(df.columns)]
+    rows.extend([_excel_cell(value) for value in row] for row in df.itertuples(index=False, name=None))
+    parser = TextParser(rows, header=0)
+    try:
+        return parser.read()
+    finally:
+        parser.close()
+
+
+def write_table_artifact(df, name):
+    artifact_format = config.TABLE_ARTIFACT_FORMAT
+    if not artifact_format:
+        return None
+
+    os.makedirs(config.TABLE_ARTIFACT_DIR, exist_ok=True)
+    path = os.path.join(config.TABLE_ARTIFACT_DIR, f"{name}.{artifact_format}")
+    try:
+        artifact = df.rename(columns=str).astype("string")
+        if artifact_format == "parquet":
+            artifact.to_parquet(path, index=False)
+        elif artifact_format == "feather":
+            artifact.reset_index(drop=True).to_feather(path)
+        else:
+            logger.warning(f"Unsupported table artifact format: {artifact_format}")
+            return None
+        return path
+    except Exception as e:
+        logger.error(f"Could not write table artifact {path}: {e}")
+        return None
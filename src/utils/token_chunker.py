@@ -0,0 +1,134 @@
+import logging
+import re
+import threading
+import pandas as pd
+from ..core.config import config
+
+logger = logging.getLogger(__name__)
+
+_SENTENCE_END = re.compile(r'[.!?]$')
+_chunker = None
+_chunker_lock = threading.Lock()
+
+
+def tokenizer_name():
+    name = config.CHUNK_TOKENIZER_NAME or config.EMBEDDING_MODEL_NAME
+    return name if '/' in name else f"sentence-transformers/{name}"
+
+
+class TokenChunker:
+    """Packs sentences into chunks that fit the embedding model's sequence length.
+
+    Counts come from the model's own WordPiece tokenizer. WordPiece pre-splits on whitespace,
+    so per-word counts add up to the count of the joined text.
+    """
+
+    def __init__(self, tokenizer, max_tokens=None, overlap_tokens=None):
+        self.tokenizer = tokenizer
+        self.max_tokens = max_tokens or config.CHUNK_MAX_TOKENS
+        self.overlap_tokens = config.CHUNK_OVERLAP_TOKENS if overlap_tokens is None else overlap_tokens
+        # [CLS] and [SEP] take two positions of the model's window.
+        self.budget = self.max_tokens - self.tokenizer.num_special_tokens_to_add()
+        if not 0 <= self.overlap_tokens < self.budget:
+            raise ValueError("overlap_tokens must be smaller than the chunk token budget")
+
+    def count(self, text):
+        return len(self.tokenizer(text, add_special_tokens=False)['input_ids'])
+
+    def _word_counts(self, words):
+        return [len(ids) for ids in self.tokenizer(words, add_special_tokens=False)['input_ids']]
+
+    def _sentences(self, words, counts):
+        sentence, sentence_tokens = [], 0
+        for word, count in zip(words, counts):
+            sentence.append((word, count))
+            sentence_tokens += count
+            if _SENTENCE_END.search(word):
+                yield sentence, sentence_tokens
+                sentence, sentence_tokens = [], 0
+        if sentence:
+            yield sentence, sentence_tokens
+
+    def _overlap(self, chunk):
+        overlap, tokens = [], 0
+        for word, count in reversed(chunk):
+            if tokens + count > self.overlap_tokens:
+                break
+            overlap.append((word, count))
+            tokens += count
+        overlap.reverse()
+        return overlap, tokens
+
+    def split(self, text):
+        if not text or pd.isna(text):
+            return []
+
+        words = str(text).split()
+        if not words:
+            return []
+
+        chunks = []
+        current, current_tokens = [], 0
+        pending = False
+
+        def emit():
+            nonlocal current, current_tokens, pending
+            chunks.append(' '.join(word for word, _ in current))
+            current, current_tokens = self._overlap(current)
+            pending = False
+
+        for sentence, sentence_tokens in self._sentences(words, self._word_counts(words)):
+            if pending and current_tokens + sentence_tokens > self.budget:
+                emit()
+            # Overlap is only context; drop it from the front rather than cut a sentence that fits on its own.
+            while current and not pending and current_tokens + sentence_tokens > self.budget:
+                current_tokens -= current.pop(0)[1]
+
+            if current_tokens + sentence_tokens <= self.budget:
+                current.extend(sentence)
+                current_tokens += sentence_tokens
+                pending = True
+                continue
+
+            # A sentence longer than the budget is cut on word boundaries.
+            for word, count in sentence:
+                if pending and current_tokens + count > self.budget:
+                    emit()
+                current.append((word, count))
+                current_tokens += count
+                pending = True
+
+        if pending:
+            chunks.append(' '.join(word for word, _ in current))
+        return chunks
+
+    def truncation_report(self, texts):
+        counts = [len(ids) for ids in self.tokenizer(list(texts), add_special_tokens=False)['input_ids']] if texts else []
+        truncated = [max(0, count - self.budget) for count in counts]
+        total_tokens = sum(counts)
+        filled_tokens = total_tokens - sum(truncated)
+        return {
+            "texts": len(counts),
+            "budget": self.budget,
+            "tokens": total_tokens,
+            "filled_tokens": filled_tokens,
+            "fill_ratio": round(filled_tokens / (len(counts) * self.budget), 4) if counts else 0.0,
+            "truncated_texts": sum(1 for count in truncated if count),
+            "truncated_tokens": sum(truncated),
+            "truncated_ratio": round(sum(truncated) / total_tokens, 4) if total_tokens else 0.0
+        }
+
+
+def get_token_chunker():
+    global _chunker
+    if _chunker is None:
+        with _chunker_lock:
+            if _chunker is None:
+                from transformers import AutoTokenizer
+                _chunker = TokenChunker(AutoTokenizer.from_pretrained(tokenizer_name()))
+                logger.info(f"Token chunker using '{tokenizer_name()}' tokenizer, {_chunker.max_tokens} tokens per chunk, {_chunker.overlap_tokens} overlap")
+    return _chunker
+
+
+def split_text_into_token_chunks(text):
+    return get_token_chunker().split(text)
@@ -0,0 +1,18 @@
+import os
+
+# Config requires these settings; tests exercise pure table and text processing only.
+for name, value in {
+    "CHROMA_HOST": "localhost",
+    "CHROMA_PORT": "8000",
+    "CHROMA_TENANT": "default_tenant",
+    "CHROMA_PERSIST_DIRECTORY": "chroma_db",
+    "LAST_PROCESSED_TABLE_PATH": "last_processed/last_processed_table.json",
+    "LAST_PROCESSED_PATH": "last_processed/last_processed.json",
+    "GOOGLE_API_KEY": "test",
+    "REDIS_HOST": "localhost",
+    "REDIS_PORT": "6379",
+    "ENV": "test",
+    "CHROMA_SERVER_CORS_ALLOW_ORIGINS": '["*"]',
+    "CHROMA_SERVER_AUTH_PROVIDER": ""
+}.items():
+    os.environ.setdefault(name, value)
@@ -0,0 +1,46 @@
+import os
+import pytest
+from src.core.config import config
+from src.processors.excel_processor import ExcelProcessor
+from src.processors.html_table_parser import create_table_parser
+from src.processors.table_chunk import chunk_table
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "fixtures", "table_notification.html")
+
+
+@pytest.mark.parametrize("backend,streaming", [("bs4", False), ("lxml", False), ("lxml", True)])
+def test_fixture_html_with_tables_produces_documents(monkeypatch, backend, streaming):
+    processor = ExcelProcessor(with_storage=False)
+    processor.table_parser = create_table_parser(backend)
+    monkeypatch.setattr(config, "HTML_STREAMING_THRESHOLD_BYTES", 0 if streaming else 1 << 30)
+
+    tables = processor.extract_tables_from_file(FIXTURE, 123)
+
+    assert [table_num for table_num, _ in tables] == [0]
+    documents = [document for table_num, df in tables for document in chunk_table(df, 123, table_num)]
+    assert [document["id"] for document in documents] == ["123_table_0_chunk_1"]
+    assert "Nakit" in documents[0]["document"]
+    assert documents[0]["metadata"]["notification_id"] == 123
+
+
+def test_lxml_streaming_drops_processed_wrappers(tmp_path, monkeypatch):
+    parser = create_table_parser("lxml")
+    wrapper = '<div class="wrapper"><div><table><tr><td>Kalem</td><td>{0}</td></tr></table></div></div>'
+    path = tmp_path / "large.html"
+    path.write_text("<html><body>" + "".join(wrapper.format(i) for i in range(500)) + "</body></html>", encoding="utf-8")
+
+    # Counts the already parsed elements still attached before each table; the parser reads
+    # ahead, so elements after it may exist too.
+    sizes = []
+    iter_table_tree = parser._iter_table_tree
+    def measured(table):
+        sizes.append(int(table.xpath("count(preceding::*)")))
+        return iter_table_tree(table)
+    monkeypatch.setattr(parser, "_iter_table_tree", measured)
+
+    tables = list(parser.iter_tables_from_file(str(path)))
+
+    assert [table_data for _, table_data in tables][-1] == [["Kalem", "499"]]
+    assert len(tables) == 500
+    # Only the previous wrapper and its cleared table remain, however many tables came before.
+    assert max(sizes) <= 3
@@ -0,0 +1,41 @@
+import threading
+from contextlib import closing
+import pytest
+from src.core.config import config
+from src.scrapers.http_fetcher import HttpFetcher
+
+
+@pytest.fixture(autouse=True)
+def no_http_cache(monkeypatch):
+    monkeypatch.setattr(config, "HTTP_CACHE_ENABLED", False)
+
+
+def test_imap_stops_submitting_once_the_consumer_stops():
+    fetcher = HttpFetcher(max_workers=2)
+    started = []
+    lock = threading.Lock()
+
+    def fetch(item):
+        with lock:
+            started.append(item)
+        if item == 3:
+            raise RuntimeError("download failed")
+        return item * 10
+
+    results = []
+    with closing(fetcher.imap(fetch, range(100), return_exceptions=True)) as fetched:
+        for result in fetched:
+            if isinstance(result, Exception):
+                break
+            results.append(result)
+
+    assert results == [0, 10, 20]
+    # Only the window of two items per worker ahead of the failure was ever started.
+    assert len(started) <= 3 + 1 + 2 * fetcher.max_workers
+
+
+def test_imap_yields_results_in_item_order():
+    fetcher = HttpFetcher(max_workers=4)
+
+    assert fetcher.map(lambda item: item * 2, range(50)) == [item * 2 for item in range(50)]
+    assert fetcher.map(lambda item: 1 / item, [1, 0], return_exceptions=False) == [1.0, None]
@@ -0,0 +1,83 @@
+import pytest
+from src.services.notification_index import NotificationIndex
+
+TITLES = [
+    (1, "TÜRK HAVA YOLLARI A.O. THYAO", "2023-03-01", "2022/12"),
+    (2, "TÜRK HAVA YOLLARI A.O. THYAO", "2023-08-15", "2023/6"),
+    (3, "TÜRK HAVA YOLLARI A.O. THYAO", "2024-03-01", "2023/12"),
+    (10, "PEGASUS HAVA TAŞIMACILIĞI A.Ş. PGSUS", "2024-02-20", "2023/12"),
+    (20, "İŞ YATIRIM MENKUL DEĞERLER A.Ş. ISMEN", "2024-02-10", "2023/12"),
+    (21, "İŞBİR HOLDİNG A.Ş. ISBIR", "2024-02-11", "2023/12"),
+    (30, "TÜRKİYE İŞ BANKASI A.Ş. ISATR, ISCTR", "2024-02-05", "2023/12"),
+]
+
+
+def records(titles):
+    return [
+        {"notification_id": notification_id, "title": title, "history": history, "period": period, "is_title": True}
+        for notification_id, title, history, period in titles
+    ]
+
+
+class TitleCollection:
+    def __init__(self, metadatas):
+        self.metadatas = metadatas
+
+    def get(self, where, include, limit, offset):
+        return {"metadatas": self.metadatas[offset:offset + limit]}
+
+
+@pytest.fixture
+def index(tmp_path):
+    index = NotificationIndex(str(tmp_path / "notification_index.sqlite3"))
+    index.add_many(records(TITLES))
+    return index
+
+
+def test_resolve_by_stock_code(index):
+    assert index.resolve("THYAO") == [3, 2, 1]
+    assert index.resolve("isctr") == [30]
+
+
+def test_resolve_by_exact_name_without_turkish_characters(index):
+    assert index.resolve("Turk Hava Yollari A.O.") == [3, 2, 1]
+
+
+def test_resolve_by_whole_word_prefix(index):
+    assert index.resolve("Pegasus") == [10]
+    # "is" is a word of "is yatirim ..." only; "isbir" must not match it.
+    assert index.resolve("İş") == [20]
+
+
+def test_resolve_by_fuzzy_name(index):
+    assert index.resolve("turk hava yolari") == [3, 2, 1]
+
+
+def test_resolve_bisects_date_range(index):
+    assert index.resolve("THYAO", start_date="2023-06-01", end_date="2024-03-01") == [3, 2]
+    assert index.resolve("THYAO", start_date="2025-01-01", end_date="2025-12-31") == []
+
+
+def test_resolve_filters_period(index):
+    assert index.resolve("THYAO", period="2023/6") == [2]
+
+
+def test_resolve_returns_none_for_unknown_company(index):
+    # None tells the chatbot to fall back to the semantic title search.
+    assert index.resolve("Garanti Bankası") is None
+    assert index.resolve("") is None
+
+
+def test_partial_index_is_not_backfilled_until_backfill_completes(tmp_path):
+    index = NotificationIndex(str(tmp_path / "notification_index.sqlite3"))
+    # An ingestion worker indexed a new notification before the API first started.
+    index.add_many(records(TITLES[2:3]))
+    assert len(index) == 1
+    assert not index.backfilled
+
+    added = index.backfill(TitleCollection(records(TITLES)), page_size=3)
+
+    assert added == len(TITLES)
+    assert index.backfilled
+    assert index.resolve("THYAO") == [3, 2, 1]
+    assert NotificationIndex(str(tmp_path / "notification_index.sqlite3")).backfilled
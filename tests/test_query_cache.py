@@ -0,0 +1,36 @@
+import pytest
+from src.core.config import config
+from src.services.query_cache import QueryAnalysisCache
+
+
+def analysis(company, query):
+    return {"function": "search_disclosures", "query_type": "financial statement",
+            "args": {"query": query, "company": company, "start_date": "2023-01-01", "end_date": "2023-12-31"}}
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    monkeypatch.setattr(config, "ANALYSIS_CACHE_REDIS_ENABLED", False)
+    monkeypatch.setattr(config, "ANALYSIS_CACHE_SEMANTIC_ENABLED", True)
+    # Every question embeds to the same vector, so only the entity guard separates them.
+    return QueryAnalysisCache(lambda texts: [[1.0, 0.0] for _ in texts])
+
+
+def test_semantic_hit_for_a_reworded_question(cache):
+    cache.get_or_compute("THYAO 2023 net kârı", lambda question: analysis("THYAO", "net kâr"))
+
+    result = cache.get_or_compute("thyao net karı 2023?", lambda question: pytest.fail("analysis recomputed"))
+
+    assert result["args"]["company"] == "THYAO"
+    assert result["args"]["query"] == "thyao net karı 2023?"
+    assert cache.stats()["hits"]["semantic"] == 1
+
+
+@pytest.mark.parametrize("question", ["PGSUS 2023 net kâr", "THYAO 2024 net kâr", "THYAO 2023 ilk çeyrek net kâr", "2023 net kâr"])
+def test_no_semantic_hit_when_company_date_or_period_differs(cache, question):
+    cache.get_or_compute("THYAO 2023 net kâr", lambda question: analysis("THYAO", "net kâr"))
+
+    result = cache.get_or_compute(question, lambda question: analysis("computed", question))
+
+    assert result["args"]["company"] == "computed"
+    assert cache.stats()["hits"]["semantic"] == 0
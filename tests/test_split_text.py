@@ -0,0 +1,57 @@
+import pytest
+from src.core.config import config
+from src.utils import split_text, token_chunker
+from src.utils.split_text import chunk_text, translation_units
+from src.utils.token_chunker import TokenChunker
+
+TURKISH = " ".join(f"Şirketimizin yönetim kurulu toplantısında kararlaştırılmıştır {i}." for i in range(200))
+
+
+class PieceTokenizer:
+    """Splits every word into pieces of four characters, like WordPiece does with rare words."""
+
+    def __call__(self, texts, add_special_tokens=False):
+        if isinstance(texts, str):
+            return {"input_ids": self._ids(texts)}
+        return {"input_ids": [self._ids(text) for text in texts]}
+
+    def _ids(self, text):
+        return [0 for word in text.split() for _ in range(0, len(word), 4)]
+
+    def num_special_tokens_to_add(self):
+        return 2
+
+
+class WordTranslation:
+    # Agglutinated Turkish words split into more pieces than the short English words they become.
+    def translate_batch(self, texts):
+        return [" ".join("the" + word[-1] if word[-1] == "." else "the" for word in text.split()) for text in texts]
+
+
+@pytest.fixture
+def chunker(monkeypatch):
+    chunker = TokenChunker(PieceTokenizer(), max_tokens=128, overlap_tokens=0)
+    monkeypatch.setattr(token_chunker, "_chunker", chunker)
+    monkeypatch.setattr(split_text, "get_translation_service", lambda: WordTranslation())
+    monkeypatch.setattr(config, "CHUNKING_STRATEGY", "tokens")
+    return chunker
+
+
+def test_translation_units_cover_text_with_whole_sentences():
+    units = translation_units(TURKISH, max_chars=500)
+
+    assert " ".join(units) == TURKISH
+    assert all(len(unit) <= 500 and unit.endswith(".") for unit in units)
+
+
+def test_token_chunks_are_budgeted_on_the_translated_text(chunker):
+    source_packed = split_text.translate_chunks(split_text.split_text_into_token_chunks(TURKISH))
+    target_packed = chunk_text(TURKISH)
+
+    source_report = chunker.truncation_report(source_packed)
+    target_report = chunker.truncation_report(target_packed)
+
+    assert source_report["fill_ratio"] < 0.5
+    assert target_report["truncated_tokens"] == 0
+    assert target_report["fill_ratio"] > 0.9
+    assert len(target_packed) < len(source_packed)
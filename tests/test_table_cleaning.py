@@ -0,0 +1,11 @@
+from benchmarks.table_cleaning import golden_comparison, load_golden
+
+
+def test_vectorized_cleaning_matches_baseline_golden_outputs():
+    golden = load_golden()
+
+    compared, mismatches = golden_comparison(golden)
+
+    assert mismatches == []
+    # Only the empty-bodied tables are rejected; everything else must be compared document by document.
+    assert compared == len(golden["tables"]) - len(golden["tables"]) // 10
@@ -0,0 +1,52 @@
+import json
+import pytest
+from src.core.config import config
+from src.services.chroma_table_service import ChromaTableService, contiguous_cursor
+
+
+@pytest.mark.parametrize("outcomes,expected", [
+    ([], None),
+    ([(101, True), (101, True), (102, True)], 102),
+    # The first failure is a new notification: everything before it was saved.
+    ([(101, True), (102, False), (103, True)], 101),
+    # The first failure is another entry of the current notification: it is not complete.
+    ([(101, True), (102, True), (102, False), (103, True)], 101),
+    ([(101, False), (102, True)], None),
+    ([(101, True), (101, False)], None),
+])
+def test_contiguous_cursor(outcomes, expected):
+    assert contiguous_cursor(outcomes) == expected
+
+
+def test_contiguous_cursor_passes_skipped_failures():
+    assert contiguous_cursor([(101, True), (102, False), (103, True)], skipped={102}) == 103
+
+
+@pytest.fixture
+def service(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "TABLE_MAX_FAILURES", 3)
+    service = ChromaTableService.__new__(ChromaTableService)
+    service.LAST_PROCESSED_TABLE = str(tmp_path / "last_processed_table.json")
+    return service
+
+
+def test_notification_failing_repeatedly_is_skipped(service):
+    outcomes = [(101, True), (102, False), (103, True)]
+
+    assert service.advance_cursor(outcomes) == 101
+    assert service.advance_cursor(outcomes) == 101
+    assert service.skipped_notifications() == set()
+
+    assert service.advance_cursor(outcomes) == 103
+    assert service.skipped_notifications() == {102}
+    assert json.load(open(service.LAST_PROCESSED_TABLE)) == {"last_id": 103, "failures": {}, "skipped": [102]}
+
+
+def test_saved_notification_resets_its_failures(service):
+    service.advance_cursor([(101, True), (102, False)])
+    service.advance_cursor([(102, False)])
+    service.advance_cursor([(102, True), (103, True)])
+
+    service.advance_cursor([(104, False)])
+
+    assert service.load_table_cursor() == {"last_id": 103, "failures": {"104": 1}, "skipped": []}